@@ -2,11 +2,14 @@ from faker import Faker
 import random
 from pathlib import Path
 import os
+from functools import partial
+from parallel_generation import iter_records
+from value_pools import FakerValues, ValuePools
 
 # Створюємо екземпляр Faker з українською локалізацією
 fake = Faker('uk_UA')
-# Додаємо англійську локалізацію для деяких даних
-fake_en = Faker('en_US')
+# Джерело міст, компаній, дат і текстів (див. use_value_pools)
+values = FakerValues(fake)
 
 # Список жартів
 JOKES = [
@@ -36,34 +39,51 @@ AD_TEMPLATES = [
     "Революційна новинка: {product} від {brand}. Змініть своє життя на краще!"
 ]
 
+PRODUCTS = ['смартфони', 'ноутбуки', 'планшети', 'телевізори',
+            'навушники', 'книги', 'меблі', 'одяг', 'взуття',
+            'косметика', 'побутова техніка']
+
+SEASONS = ['весна', 'літо', 'осінь', 'зима']
+
+def use_value_pools(enabled=True, base_date=None, **options):
+    """Switch generate_record between Faker calls and pre-sampled value pools (see value_pools.py)"""
+    global values
+    values = ValuePools('uk_UA', base_date=base_date, **options) if enabled else FakerValues(fake, base_date=base_date)
+
 def generate_ad():
-    template = random.choice(AD_TEMPLATES)
+    template = values.choice(AD_TEMPLATES)
     return template.format(
-        product=random.choice(['смартфони', 'ноутбуки', 'планшети', 'телевізори', 
-                             'навушники', 'книги', 'меблі', 'одяг', 'взуття', 
-                             'косметика', 'побутова техніка']),
+        product=values.choice(PRODUCTS),
         discount=random.randint(10, 90),
-        date=fake.date_between(start_date='today', end_date='+30d').strftime('%d.%m.%Y'),
-        brand=fake.company(),
-        season=random.choice(['весна', 'літо', 'осінь', 'зима'])
+        date=values.date().strftime('%d.%m.%Y'),
+        brand=values.company(),
+        season=values.choice(SEASONS)
     )
 
+def seed_generator(seed):
+    """Seed random and Faker, parallel_generation calls it for every chunk"""
+    random.seed(seed)
+    fake.seed_instance(seed)
+    values.reset()
+
 def generate_record():
     record_type = random.choice(["news", "ad", "joke"])
     
     if record_type == "news":
-        content = fake.text(max_nb_chars=200)
-        additional = fake.city()
+        content = values.text(max_nb_chars=200)
+        additional = values.city()
     elif record_type == "ad":
         content = generate_ad()
-        additional = fake.date_between(start_date='today', end_date='+30d').strftime('%d-%m-%Y')
+        additional = values.date().strftime('%d-%m-%Y')
     else:  # joke
-        content = random.choice(JOKES)
+        content = values.choice(JOKES)
         additional = str(random.randint(1, 10))
     
     return [record_type, content, additional]
 
-def create_file(filename, num_records=10):
+def create_file(filename, num_records=10, workers=1, seed=None, unique=False, value_pools=False):
+    """workers > 1 (None for all CPUs) generates records in a process pool, see parallel_generation.py;
+    value_pools=True draws values from pre-sampled pools, see use_value_pools"""
     try:
         # Створюємо директорію, якщо вона не існує
         directory = os.path.dirname(filename)
@@ -72,11 +92,13 @@ def create_file(filename, num_records=10):
         
         # Створюємо файл і записуємо дані
         with open(filename, 'w', encoding='utf-8') as file:
-            for i in range(num_records):
-                record = generate_record()
-                file.write(f"{record[0]}\n{record[1]}\n{record[2]}")
-                if i < num_records - 1:
+            # Джерело значень задається в цьому процесі та в кожному робочому процесі
+            records = iter_records(generate_record, seed_generator, num_records, workers, seed, unique,
+                                   setup=partial(use_value_pools, value_pools))
+            for i, record in enumerate(records):
+                if i > 0:
                     file.write("\n---\n")
+                file.write(f"{record[0]}\n{record[1]}\n{record[2]}")
         
         print(f"Файл успішно створено: {filename}")
         return True
@@ -0,0 +1,109 @@
+"""
+Parallel record generation for the content generators.
+
+Records are generated in chunks of `chunk_size`. Every chunk reseeds the
+generator module (random + Faker) with its own seed derived from the base seed
+and the chunk number, so a seeded run produces the same records whether it
+runs in one process or in a process pool of any size. Chunks are merged back
+in chunk order.
+
+With unique=True a record is skipped when a record with the same content was
+already produced (the first 8 bytes of the SHA-256 of the content are
+compared, hashes are computed in the workers).
+
+Worker processes started with `spawn` (the default on Windows and macOS)
+re-import the generator module and do not see changes the parent made to its
+globals, so module state such as the value source is set up by `setup`, which
+runs in this process and once in every worker.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import hashlib
+import os
+import random
+
+CHUNK_SIZE = 1000
+
+
+def _content_of(record):
+    # Генератори повертають або список [type, content, additional], або словник
+    return record["content"] if isinstance(record, dict) else record[1]
+
+
+def _content_hash(record):
+    return int.from_bytes(hashlib.sha256(_content_of(record).encode('utf-8')).digest()[:8], "big")
+
+
+def _generate_chunk(generate_record, seed_generator, seed, count):
+    if seed is not None:
+        seed_generator(seed)
+    return [(_content_hash(record), record) for record in (generate_record() for _ in range(count))]
+
+
+def _iter_tasks(total, seed, chunk_size):
+    for index, start in enumerate(range(0, total, chunk_size)):
+        yield (None if seed is None else f"{seed}:{index}"), min(chunk_size, total - start)
+
+
+def _iter_chunks(generate_record, seed_generator, total, workers, seed, chunk_size, setup):
+    tasks = _iter_tasks(total, seed, chunk_size)
+    if setup is not None:
+        setup()
+    if workers == 1:
+        for chunk_seed, count in tasks:
+            yield _generate_chunk(generate_record, seed_generator, chunk_seed, count)
+        return
+
+    executor = ProcessPoolExecutor(workers, initializer=setup)
+    try:
+        # Не більше двох чанків на процес в черзі, щоб не тримати весь корпус у пам'яті
+        pending = deque(
+            executor.submit(_generate_chunk, generate_record, seed_generator, chunk_seed, count)
+            for chunk_seed, count in islice(tasks, workers * 2)
+        )
+        while pending:
+            chunk = pending.popleft().result()
+            for chunk_seed, count in islice(tasks, 1):
+                pending.append(executor.submit(_generate_chunk, generate_record, seed_generator, chunk_seed, count))
+            yield chunk
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def iter_records(generate_record, seed_generator, num_records, workers=1, seed=None, unique=False,
+                 max_attempts=None, chunk_size=CHUNK_SIZE, setup=None):
+    """
+    Yields up to `num_records` records produced by `generate_record`.
+
+    Args:
+        generate_record: Module-level function returning one record.
+        seed_generator: Module-level function seeding random and Faker of that module.
+        workers (int): Number of processes, None for all CPUs, 1 to generate in this process.
+        seed: Base seed; None keeps the unseeded behaviour for a single process.
+        unique (bool): Skip records whose content was already produced.
+        max_attempts (int): Records to generate at most (3 * num_records with unique=True).
+        setup: Module-level function (or functools.partial of one) preparing the generator
+            module, e.g. choosing its value source; runs here and in every worker process.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_attempts = max_attempts or (num_records * 3 if unique else num_records)
+    if seed is None and workers > 1:
+        # Процеси мають отримати різні seed, інакше вони згенерують однакові записи
+        seed = random.randrange(2 ** 32)
+
+    if num_records <= 0:
+        return
+    seen = set()
+    produced = 0
+    for chunk in _iter_chunks(generate_record, seed_generator, max_attempts, workers, seed, chunk_size, setup):
+        for content_hash, record in chunk:
+            if unique:
+                if content_hash in seen:
+                    continue
+                seen.add(content_hash)
+            yield record
+            produced += 1
+            if produced >= num_records:
+                return
@@ -0,0 +1,105 @@
+"""
+Value sources for the content generators.
+
+FakerValues calls Faker for every value, as the generators always did.
+ValuePools calls Faker only once, when it is created: it pre-samples cities,
+companies and sentences into pools (with its own seeded Faker, so the pools
+are the same in every process) and then draws values from them in bulk with
+random.choices. Both have the same methods, so a generator can switch between
+them without other changes. Dates are drawn from base_date .. base_date + days;
+with a fixed base_date (today by default) the output does not depend on the day
+it is generated.
+
+Draws use the global `random` module: after random.seed() call reset(), so
+that values left over in the buffers do not leak into the seeded sequence.
+"""
+
+from datetime import date, timedelta
+import random
+
+from faker import Faker
+
+BUFFER_SIZE = 10000
+
+
+class FakerValues:
+    """Every value straight from Faker."""
+
+    def __init__(self, fake, days=30, base_date=None):
+        self.fake = fake
+        self.days = days
+        self.base_date = base_date or date.today()
+
+    def city(self):
+        return self.fake.city()
+
+    def company(self):
+        return self.fake.company()
+
+    def date(self):
+        end_date = self.base_date + timedelta(days=self.days)
+        return self.fake.date_between(start_date=self.base_date, end_date=end_date)
+
+    def text(self, max_nb_chars=200):
+        return self.fake.text(max_nb_chars=max_nb_chars)
+
+    def choice(self, values):
+        return random.choice(values)
+
+    def reset(self):
+        pass
+
+
+class ValuePools:
+    """
+    Pre-sampled values, drawn in bulk.
+
+    Args:
+        locale (str): Faker locale of the pools.
+        size (int): Number of cities and of companies to pre-sample.
+        sentences (int): Number of sentences to pre-sample for texts.
+        days (int): Dates are drawn from base_date .. base_date + days.
+        seed: Seed of the Faker that fills the pools.
+        base_date (date): First date of the range, today by default.
+    """
+
+    def __init__(self, locale='uk_UA', size=1000, sentences=5000, days=30, seed=0, base_date=None):
+        fake = Faker(locale)
+        fake.seed_instance(seed)
+        self.cities = [fake.city() for _ in range(size)]
+        self.companies = [fake.company() for _ in range(size)]
+        self.sentences = [fake.sentence() for _ in range(sentences)]
+        base_date = base_date or date.today()
+        self.dates = [base_date + timedelta(days=day) for day in range(days + 1)]
+        self.buffers = {}
+
+    def draw(self, values):
+        # Буфер на кожен список значень, поповнюється одним викликом random.choices
+        buffer = self.buffers.get(id(values))
+        if not buffer:
+            buffer = self.buffers[id(values)] = random.choices(values, k=BUFFER_SIZE)
+        return buffer.pop()
+
+    def city(self):
+        return self.draw(self.cities)
+
+    def company(self):
+        return self.draw(self.companies)
+
+    def date(self):
+        return self.draw(self.dates)
+
+    def text(self, max_nb_chars=200):
+        """Sentences from the pool joined while the text fits into max_nb_chars."""
+        text = self.draw(self.sentences)[:max_nb_chars]
+        while True:
+            sentence = self.draw(self.sentences)
+            if len(text) + 1 + len(sentence) > max_nb_chars:
+                return text
+            text += " " + sentence
+
+    def choice(self, values):
+        return self.draw(values)
+
+    def reset(self):
+        self.buffers.clear()
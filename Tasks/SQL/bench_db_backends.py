@@ -0,0 +1,100 @@
+"""
+Benchmark: DBManager on the sqlite3 and pyodbc backends.
+
+Both backends run the same workload on a fresh temporary database: saving
+records one by one through DBManager (a connection and a commit per record,
+as ContentManager does), then reading feed pages, full-text search and
+active ads. Backends that are not installed are skipped.
+
+Usage: python bench_db_backends.py [--records 5000] [--queries 500]
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from db_backend import BACKENDS
+from db_content_manager import DBManager
+
+CITIES = ["Київ", "Львів", "Одеса", "Харків", "Дніпро"]
+WORDS = ["новина", "реклама", "знижка", "місто", "сьогодні", "акція", "погода", "концерт", "виставка", "ринок"]
+
+
+def make_records(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    records = []
+    for number in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))) + f" #{number}"
+        created_at = start + timedelta(minutes=number)
+        kind = rng.choice(["news", "ad", "joke"])
+        if kind == "news":
+            additional = rng.choice(CITIES)
+        elif kind == "ad":
+            additional = (created_at + timedelta(days=rng.randint(-30, 30))).strftime("%d-%m-%Y")
+        else:
+            additional = rng.randint(1, 10)
+        records.append((kind, text, additional, created_at))
+    return records
+
+
+def save_all(db_manager, records):
+    for kind, text, additional, created_at in records:
+        if kind == "news":
+            db_manager.save_news(text, additional, created_at)
+        elif kind == "ad":
+            db_manager.save_ad(text, additional, created_at)
+        else:
+            db_manager.save_joke(text, additional, created_at)
+
+
+def read_pages(db_manager, queries):
+    after = None
+    for _ in range(queries):
+        # Після останньої сторінки починаємо знову з початку стрічки
+        _, after = db_manager.get_feed_page(20, after)
+
+
+def search_all(db_manager, queries):
+    for number in range(queries):
+        db_manager.search(WORDS[number % len(WORDS)], limit=20)
+
+
+def active_ads(db_manager, queries):
+    for _ in range(queries):
+        db_manager.get_active_ads("2025-01-15")
+
+
+def measure(label, func, operations):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {elapsed:8.2f} s {operations / elapsed:12,.0f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    for name in BACKENDS:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                db_manager = DBManager(os.path.join(temp_dir, "bench.db"), name)
+            except Exception as e:
+                print(f"{name}: skipped ({e})")
+                continue
+            print(f"{name}:")
+            measure("insert (per record)", lambda: save_all(db_manager, records), len(records))
+            measure("feed pages", lambda: read_pages(db_manager, args.queries), args.queries)
+            measure("full-text search", lambda: search_all(db_manager, args.queries), args.queries)
+            measure("active ads", lambda: active_ads(db_manager, args.queries), args.queries)
+
+
+if __name__ == "__main__":
+    main()
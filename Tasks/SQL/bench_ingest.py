@@ -0,0 +1,91 @@
+"""
+Benchmark: ContentManager ingest of generated_content.txt.
+
+Runs the same path as menu option 4 (process_file, then save_content for
+every record: txt, JSON, XML and database) in a fresh temporary directory.
+The manager gets a FixedClock, so timestamps and "days left" do not depend on
+when the benchmark runs. Each run is repeated and the resulting stores are
+compared byte for byte, so two timings always measure the same output.
+
+Usage: python bench_ingest.py [--records 2000] [--runs 2]
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from clock import FixedClock
+from db_content_manager import ContentManager
+
+# Усі записи та "days left" рахуються від цього моменту
+BENCH_MOMENT = datetime(2025, 1, 1, 12, 0)
+STORE_FILES = ("content_storage.txt", "content_storage.json", "content_storage.xml")
+
+CITIES = ["Київ", "Львів", "Одеса", "Харків", "Дніпро"]
+WORDS = ["новина", "реклама", "знижка", "місто", "сьогодні", "акція", "погода", "концерт", "виставка", "ринок"]
+
+
+def write_generated_file(filename, count, seed=42):
+    """Writes `count` records in the generated_content.txt format."""
+    rng = random.Random(seed)
+    with open(filename, "w", encoding="utf-8") as file:
+        for number in range(count):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))) + f" #{number}"
+            kind = rng.choice(["news", "ad", "joke"])
+            if kind == "news":
+                additional = rng.choice(CITIES)
+            elif kind == "ad":
+                additional = (BENCH_MOMENT + timedelta(days=rng.randint(1, 30))).strftime("%d-%m-%Y")
+            else:
+                additional = rng.randint(1, 10)
+            if number:
+                file.write("\n---\n")
+            file.write(f"{kind}\n{text}\n{additional}")
+
+
+def store_digest(storage_dir):
+    digest = hashlib.sha256()
+    for name in STORE_FILES:
+        with open(os.path.join(storage_dir, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def run_ingest(records):
+    """One ingest into a fresh directory. Returns (parse seconds, save seconds, store digest)."""
+    with tempfile.TemporaryDirectory() as storage_dir:
+        write_generated_file(os.path.join(storage_dir, "generated_content.txt"), records)
+        manager = ContentManager(FixedClock(BENCH_MOMENT), storage_dir)
+
+        start = time.perf_counter()
+        contents = manager.process_file()
+        parsed = time.perf_counter()
+        for content in contents:
+            manager.save_content(content)
+        saved = time.perf_counter()
+        return parsed - start, saved - parsed, store_digest(storage_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=2)
+    args = parser.parse_args()
+
+    digests = set()
+    for run in range(1, args.runs + 1):
+        parse_time, save_time, digest = run_ingest(args.records)
+        digests.add(digest)
+        print(f"run {run}: parse {parse_time:6.2f} s, save {save_time:7.2f} s "
+              f"{args.records / save_time:10,.0f} records/s  stores {digest[:12]}")
+    if len(digests) > 1:
+        raise SystemExit("The runs produced different stores, timings are not comparable")
+    print("All runs produced identical stores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: per-letter rescans vs single-pass letter statistics
+(pure Python and, when installed, NumPy).
+
+Builds a synthetic store by repeating content_storage.txt up to the requested
+size and times analyze_letters on it. The old implementation rescans the whole
+text once per distinct letter, so by default it only runs on a smaller store
+(--legacy-mb) and both results are compared there.
+
+Usage: python bench_letter_stats.py [--mb 100] [--legacy-mb 5]
+"""
+
+from collections import Counter
+import argparse
+import os
+import tempfile
+import time
+
+from csv_word_count_v2 import analyze_letters, content_file, np
+
+
+def legacy_analyze_letters(filename):
+    # Стара реалізація: окремий прохід по тексту для кожної літери
+    with open(filename, 'r', encoding='utf-8') as file:
+        content = file.read()
+    letters = [char for char in content if char.isalpha()]
+    letter_counter = Counter(letters)
+    total_letters = len(letters)
+    letter_stats = {}
+    for letter, count in letter_counter.items():
+        letter_stats[letter] = {
+            'count': count,
+            'uppercase': sum(1 for c in content if c == letter.upper()),
+            'percentage': round((count / total_letters) * 100, 2)
+        }
+    return letter_stats
+
+
+def python_letters(filename):
+    return analyze_letters(filename, use_numpy=False)
+
+
+def numpy_letters(filename):
+    return analyze_letters(filename, use_numpy=True)
+
+
+def build_store(path, size_mb, source=content_file):
+    with open(source, 'r', encoding='utf-8') as file:
+        sample = file.read()
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        while written < target:
+            file.write(sample)
+            written += len(sample.encode('utf-8'))
+    return written
+
+
+def measure(label, func, filename):
+    start = time.perf_counter()
+    result = func(filename)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(filename) / 1024 / 1024
+    print(f"{label:<32} {size_mb:7.1f} MB {elapsed:9.2f} s {size_mb / elapsed:9.1f} MB/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=100, help="size of the store for the single-pass run")
+    parser.add_argument("--legacy-mb", type=int, default=5, help="size of the store for the comparison run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        small_store = os.path.join(temp_dir, "legacy_store.txt")
+        build_store(small_store, args.legacy_mb)
+        legacy = measure("legacy (rescan per letter)", legacy_analyze_letters, small_store)
+        single = measure("single pass, pure Python", python_letters, small_store)
+        print(f"Same statistics: {legacy == single}, distinct letters: {len(single)}")
+        if np is not None:
+            vectorized = measure("single pass, NumPy", numpy_letters, small_store)
+            print(f"NumPy matches: {vectorized == single}")
+        print()
+
+        store = os.path.join(temp_dir, "store.txt")
+        build_store(store, args.mb)
+        measure("single pass, pure Python", python_letters, store)
+        if np is not None:
+            measure("single pass, NumPy", numpy_letters, store)
+        else:
+            print("NumPy is not installed, vectorized path skipped")
+
+
+if __name__ == "__main__":
+    main()
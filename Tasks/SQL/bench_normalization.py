@@ -0,0 +1,90 @@
+"""
+Benchmark: per-record normalize_text vs the batched TextNormalizer.
+
+The sentence-case run is compared with the 04_02 approach (uncompiled re.sub
+for every sentence of every text), adapted to the output of
+TextNormalizer(sentence_case=True). The original 04_02 function returns a
+list of sentences, splits on every '.' (even without a following space),
+appends '.' to each sentence and ignores '!' and '?'. The adapted version
+returns one string and treats '.', '!' and '?' followed by a space as a
+sentence end. Both pairs are checked for equal output before timing.
+
+Usage: python bench_normalization.py [number_of_texts]
+"""
+
+import random
+import re
+import sys
+import time
+
+from text_normalizer import HOMEWORK_CORRECTIONS, TextNormalizer
+
+WORDS = ["новина", "реклама", "жарт", "tHis", "iz", "your", "homeWork", "Kyiv", "знижка", "сьогодні"]
+
+
+def make_sentence(rng, spaces):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(3, 8))]
+    return "".join(word + rng.choice(spaces) for word in words[:-1]) + words[-1] + rng.choice(".!?")
+
+
+def make_texts(count, seed=42):
+    """Texts of 1-3 sentences ending with '.', '!' or '?', with irregular whitespace."""
+    rng = random.Random(seed)
+    spaces = [" ", "  ", "\t", "\n", "   "]
+    return [
+        "".join(make_sentence(rng, spaces) + rng.choice(spaces) for _ in range(rng.randint(1, 3)))
+        for _ in range(count)
+    ]
+
+
+def legacy_normalize_text(text):
+    # Копія normalize_text із content manager модулів
+    text = ' '.join(text.split())
+    return text[0].upper() + text[1:] if text else text
+
+
+def legacy_homework_normalize(text):
+    # Підхід 04_02 normalize_text (некомпільовані re.sub для кожного речення),
+    # але з тим самим результатом, що й TextNormalizer(sentence_case=True)
+    sentences = re.split(r"(?<=[.!?]) ", re.sub(r"\s+", " ", text).strip().lower())
+    normalized_sentences = []
+    for sentence in sentences:
+        sentence = re.sub(r"\biz\b", "is", sentence)
+        normalized_sentences.append(sentence[:1].upper() + sentence[1:])
+    return " ".join(normalized_sentences)
+
+
+def check_outputs(label, expected, actual):
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    if mismatches or len(expected) != len(actual):
+        raise SystemExit(f"{label}: {mismatches} of {len(expected)} outputs differ, timings are not comparable")
+
+
+def measure(label, func, texts):
+    start = time.perf_counter()
+    func(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed:8.3f} s  {len(texts) / elapsed:12,.0f} texts/s")
+    return elapsed
+
+
+def main(count):
+    texts = make_texts(count)
+    default = TextNormalizer()
+    homework = TextNormalizer(corrections=HOMEWORK_CORRECTIONS, sentence_case=True)
+
+    # Спочатку перевіряємо, що порівнюються функції з однаковим результатом
+    sample = texts[:10000]
+    check_outputs("default", [legacy_normalize_text(x) for x in sample], default.normalize_batch(sample))
+    check_outputs("sentence case", [legacy_homework_normalize(x) for x in sample], homework.normalize_batch(sample))
+    print(f"Normalizing {count:,} short texts (outputs checked on {len(sample):,})\n")
+
+    measure("legacy normalize_text (per record)", lambda t: [legacy_normalize_text(x) for x in t], texts)
+    measure("TextNormalizer.normalize_batch", default.normalize_batch, texts)
+    print()
+    measure("04_02 approach (per record)", lambda t: [legacy_homework_normalize(x) for x in t], texts)
+    measure("TextNormalizer(corrections, sentence_case)", homework.normalize_batch, texts)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,43 @@
+"""
+Benchmark: generate_record with Faker calls vs pre-sampled value pools.
+
+Faker is slow, so by default the Faker run generates fewer records
+(--faker-records) and both rates are compared in records per second.
+
+Usage: python bench_value_pools.py [--records 1000000] [--faker-records 100000]
+"""
+
+import argparse
+import time
+
+import db_contnent_generator as generator
+
+
+def measure(label, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.generate_record()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>10,} records {elapsed:9.2f} s {count / elapsed:12,.0f} records/s")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--faker-records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    generator.seed_generator(42)
+    faker_rate = measure("Faker for every value", args.faker_records)
+
+    start = time.perf_counter()
+    generator.use_value_pools()
+    print(f"{'building the pools':<28} {time.perf_counter() - start:30.2f} s")
+    generator.seed_generator(42)
+    pools_rate = measure("pre-sampled value pools", args.records)
+    print(f"Speedup: {pools_rate / faker_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Binary record store for the content feed.
+
+Records are kept in a compact length-prefixed file (``*.bin``) with a sidecar
+offset index (``*.idx``). The index holds one fixed-width offset per record, so
+record #n is fetched with two seeks, appends are a single write to each file and
+a sequential scan never touches the index at all.
+
+Data file layout:
+    MAGIC | record | record | ...
+    record = <uint32 payload length> <payload>
+    payload = <uint8 type> <uint32 len> content <uint32 len> additional
+              <uint32 len> timestamp
+
+Index file layout:
+    <uint64 offset of record 0> <uint64 offset of record 1> ...
+
+Each record is a ``Record(type, content, additional, timestamp)`` - the same
+triple that the generators write to generated_content.txt, plus the optional
+creation timestamp taken from the storage files.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from xml.etree import ElementTree as ET
+import argparse
+import json
+import os
+import sqlite3
+import struct
+
+MAGIC = b"CFBS\x01"
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<BIII")
+_OFFSET = struct.Struct("<Q")
+
+TYPE_CODES = {"news": 1, "ad": 2, "ads": 2, "joke": 3}
+TYPE_NAMES = {1: "news", 2: "ad", 3: "joke"}
+
+Record = namedtuple("Record", ["type", "content", "additional", "timestamp"], defaults=[""])
+
+
+def encode_record(record):
+    """Encodes a Record into the binary payload (without the length prefix)."""
+    try:
+        type_code = TYPE_CODES[record.type]
+    except KeyError:
+        raise ValueError(f"Unknown record type: {record.type}")
+    content = record.content.encode("utf-8")
+    additional = record.additional.encode("utf-8")
+    timestamp = (record.timestamp or "").encode("utf-8")
+    header = _HEADER.pack(type_code, len(content), len(additional), len(timestamp))
+    return header + content + additional + timestamp
+
+
+def decode_record(payload):
+    """Decodes a binary payload back into a Record."""
+    type_code, content_len, additional_len, timestamp_len = _HEADER.unpack_from(payload)
+    start = _HEADER.size
+    content = payload[start:start + content_len].decode("utf-8")
+    start += content_len
+    additional = payload[start:start + additional_len].decode("utf-8")
+    start += additional_len
+    timestamp = payload[start:start + timestamp_len].decode("utf-8")
+    return Record(TYPE_NAMES[type_code], content, additional, timestamp)
+
+
+class BinaryRecordStore:
+    """
+    Append-only binary record file with an offset index for random access.
+
+    The data file is the source of truth: if the index is missing or shorter
+    than the data file (e.g. after a crash between the two writes), it is
+    rebuilt by a single sequential scan when the store is opened.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self._data = None
+        self._index = None
+        self._count = 0
+        self._open()
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "wb") as file:
+                file.write(MAGIC)
+            with open(self.index_path, "wb"):
+                pass
+
+        self._data = open(self.path, "r+b")
+        if self._data.read(len(MAGIC)) != MAGIC:
+            self._data.close()
+            raise ValueError(f"Not a binary record store: {self.path}")
+
+        if not os.path.exists(self.index_path):
+            self.rebuild_index()
+        self._index = open(self.index_path, "r+b")
+        self._count = os.path.getsize(self.index_path) // _OFFSET.size
+        self._recover()
+
+    def _recover(self):
+        """Brings the index in line with the data file after an interrupted append."""
+        self._data.seek(0, os.SEEK_END)
+        data_end = self._data.tell()
+        if self._count == 0:
+            expected_end = len(MAGIC)
+        else:
+            last_offset = self._read_offset(self._count - 1)
+            self._data.seek(last_offset)
+            (length,) = _LENGTH.unpack(self._data.read(_LENGTH.size))
+            expected_end = last_offset + _LENGTH.size + length
+        if expected_end != data_end:
+            self._index.close()
+            self.rebuild_index()
+            self._index = open(self.index_path, "r+b")
+            self._count = os.path.getsize(self.index_path) // _OFFSET.size
+
+    def rebuild_index(self):
+        """Rewrites the sidecar index from a sequential scan of the data file."""
+        offsets = bytearray()
+        valid_end = len(MAGIC)
+        for offset, _ in self._scan_payloads():
+            offsets += _OFFSET.pack(offset)
+            valid_end = self._data.tell()
+        # Відрізаємо недописаний хвіст, якщо запис обірвався посередині
+        self._data.truncate(valid_end)
+        with open(self.index_path, "wb") as file:
+            file.write(offsets)
+
+    def _scan_payloads(self):
+        self._data.seek(len(MAGIC))
+        while True:
+            offset = self._data.tell()
+            prefix = self._data.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            payload = self._data.read(length)
+            if len(payload) < length:
+                return
+            yield offset, payload
+
+    def _read_offset(self, n):
+        self._index.seek(n * _OFFSET.size)
+        return _OFFSET.unpack(self._index.read(_OFFSET.size))[0]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, n):
+        """Fetches record #n in O(1): one index read and one data read."""
+        if n < 0:
+            n += self._count
+        if not 0 <= n < self._count:
+            raise IndexError("record index out of range")
+        self._data.seek(self._read_offset(n))
+        (length,) = _LENGTH.unpack(self._data.read(_LENGTH.size))
+        return decode_record(self._data.read(length))
+
+    def __iter__(self):
+        """Sequential scan over all records without touching the index."""
+        for _, payload in self._scan_payloads():
+            yield decode_record(payload)
+
+    def append(self, record):
+        """Appends one record and returns its number."""
+        return self.extend([record]) - 1
+
+    def extend(self, records, flush_bytes=1 << 20):
+        """Appends many records in large writes and returns the new record count."""
+        self._data.seek(0, os.SEEK_END)
+        self._index.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        chunk = bytearray()
+        offsets = bytearray()
+        for record in records:
+            payload = encode_record(record)
+            offsets += _OFFSET.pack(offset + len(chunk))
+            chunk += _LENGTH.pack(len(payload))
+            chunk += payload
+            if len(chunk) >= flush_bytes:
+                offset += self._write_chunk(chunk, offsets)
+                chunk.clear()
+                offsets.clear()
+        if chunk:
+            self._write_chunk(chunk, offsets)
+        return self._count
+
+    def _write_chunk(self, chunk, offsets):
+        # Спочатку дані, потім індекс - так обірваний запис видно при відкритті
+        self._data.write(chunk)
+        self._data.flush()
+        self._index.write(offsets)
+        self._index.flush()
+        self._count += len(offsets) // _OFFSET.size
+        return len(chunk)
+
+    def close(self):
+        if self._data:
+            self._data.close()
+            self._data = None
+        if self._index:
+            self._index.close()
+            self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _reformat_date(value, source_format, target_format="%d-%m-%Y"):
+    try:
+        return datetime.strptime(value, source_format).strftime(target_format)
+    except ValueError:
+        return value
+
+
+def read_generated_txt(filename):
+    """Reads records from the generated_content.txt format ('---' separated blocks)."""
+    def to_record(lines):
+        content = lines[1] if len(lines) > 1 else ""
+        additional = lines[2] if len(lines) > 2 else ""
+        return Record(lines[0].lower(), content, additional)
+
+    lines = []
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line == "---":
+                if lines:
+                    yield to_record(lines)
+                lines = []
+            else:
+                lines.append(line)
+    if lines:
+        yield to_record(lines)
+
+
+def _record_from_dict(item):
+    record_type = item["type"]
+    # Формат generated_content.json: type / content / additional
+    if "content" in item:
+        return Record(record_type, item["content"], item["additional"], item.get("timestamp", ""))
+    # Формат content_storage.json: результат Content.to_json()
+    match record_type:
+        case "news":
+            return Record("news", item["text"], item["city"], item.get("timestamp", ""))
+        case "ad" | "ads":
+            return Record("ad", item["text"], _reformat_date(item["expiration_date"], "%d/%m/%Y"))
+        case "joke":
+            return Record("joke", item["text"], str(item["funny_rating"]))
+        case _:
+            raise ValueError(f"Unknown record type: {record_type}")
+
+
+def read_json(filename):
+    """Reads records from content_storage.json or generated_content.json."""
+    with open(filename, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    for item in data:
+        yield _record_from_dict(item)
+
+
+def read_jsonl(filename):
+    """Reads records from a JSON Lines corpus (one generated_content.json item per line)."""
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield _record_from_dict(json.loads(line))
+
+
+def read_xml(filename):
+    """Reads records from content_storage.xml (the <content> root written by ContentManager)."""
+    root = None
+    for event, element in ET.iterparse(filename, events=("start", "end")):
+        if root is None:
+            root = element
+        if event == "start":
+            continue
+        match element.tag:
+            case "news":
+                yield Record("news", element.findtext("text", ""), element.findtext("city", ""),
+                             element.findtext("timestamp", ""))
+            case "ad":
+                yield Record("ad", element.findtext("text", ""),
+                             _reformat_date(element.findtext("expiration_date", ""), "%d/%m/%Y"))
+            case "joke":
+                yield Record("joke", element.findtext("text", ""), element.findtext("funny_rating", ""))
+            case _:
+                continue
+        # element.clear() залишає порожні записи в корені, тому звільняємо сам корінь
+        root.clear()
+
+
+DB_TABLES = (
+    ("news", "news", "city"),
+    ("ads", "ad", "expiration_date"),
+    ("joke", "joke", "funny_rating"),
+)
+
+
+def read_db(db_path):
+    """Reads records from a content DB (news, ads and joke tables) with the stdlib sqlite3."""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        for table, record_type, column in DB_TABLES:
+            columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+            if "content" in columns:
+                cursor.execute(f"SELECT content, {column} FROM {table} ORDER BY id")
+            else:
+                cursor.execute(
+                    f"SELECT b.content, t.{column} FROM {table} t "
+                    f"JOIN content_blobs b ON b.content_hash = t.content_hash ORDER BY t.id"
+                )
+            for content, additional in cursor:
+                yield Record(record_type, content, str(additional))
+
+
+def write_generated_txt(records, filename):
+    """Writes records in the generated_content.txt format, ready for ContentManager.process_file."""
+    count = 0
+    with open(filename, "w", encoding="utf-8") as file:
+        for record in records:
+            if count:
+                file.write("\n---\n")
+            file.write(f"{record.type}\n{record.content}\n{record.additional}")
+            count += 1
+    return count
+
+
+def write_json(records, filename):
+    """Writes records in the generated_content.json format."""
+    data = [
+        {"type": record.type, "content": record.content, "additional": record.additional}
+        for record in records
+    ]
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+    return len(data)
+
+
+READERS = {
+    ".txt": read_generated_txt,
+    ".json": read_json,
+    ".jsonl": read_jsonl,
+    ".xml": read_xml,
+    ".db": read_db,
+}
+
+WRITERS = {
+    ".txt": write_generated_txt,
+    ".json": write_json,
+}
+
+
+def import_records(source, store_path):
+    """Appends all records from a txt/json/jsonl/xml/db source to a binary store."""
+    reader = READERS.get(os.path.splitext(source)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported source format: {source}")
+    with BinaryRecordStore(store_path) as store:
+        before = len(store)
+        return store.extend(reader(source)) - before
+
+
+def export_records(store_path, target):
+    """Writes all records from a binary store to a txt/json file for replay."""
+    writer = WRITERS.get(os.path.splitext(target)[1].lower())
+    if writer is None:
+        raise ValueError(f"Unsupported target format: {target}")
+    with BinaryRecordStore(store_path) as store:
+        return writer(iter(store), target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert content stores to and from the binary record format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="append records from txt/json/jsonl/xml/db to a .bin store")
+    import_parser.add_argument("source")
+    import_parser.add_argument("store")
+
+    export_parser = subparsers.add_parser("export", help="write records from a .bin store to txt/json")
+    export_parser.add_argument("store")
+    export_parser.add_argument("target")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        count = import_records(args.source, args.store)
+        print(f"Imported {count} records into {args.store}")
+    else:
+        count = export_records(args.store, args.target)
+        print(f"Exported {count} records to {args.target}")
@@ -0,0 +1,104 @@
+"""
+Check: migrating a legacy content database to the latest schema.
+
+Builds a database with the original DBManager layout (texts inside the news,
+ads and joke tables, funny_rating as TEXT) in a temporary directory, including
+joke ratings outside 1-10 and non-numeric ones, and runs migrate() on it with a
+small batch size. The ratings must come out clamped to 1-10, every text must
+be in content_blobs, and a second run must apply nothing.
+
+Usage: python check_migrations.py
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+from db_migrations import LATEST_VERSION, get_version, migrate, table_columns
+
+LEGACY_SQL = """
+CREATE TABLE news (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    city TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+CREATE TABLE ads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    expiration_date TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+CREATE TABLE joke (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    funny_rating TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+"""
+
+# Рейтинг у старій базі -> очікуваний після міграції
+LEGACY_RATINGS = {"5": 5, "10": 10, "15": 10, "0": 1, "-3": 1, "abc": 1, "7.9": 7, "": 1}
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_legacy_db(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(LEGACY_SQL)
+        conn.executemany(
+            "INSERT INTO news (content, city, content_hash) VALUES (?, ?, ?)",
+            [(f"Новина {number}", "Київ", text_hash(f"Новина {number}")) for number in range(5)]
+        )
+        conn.executemany(
+            "INSERT INTO ads (content, expiration_date, content_hash) VALUES (?, ?, ?)",
+            [(f"Реклама {number}", f"{number + 10}-08-2026", text_hash(f"Реклама {number}")) for number in range(5)]
+        )
+        conn.executemany(
+            "INSERT INTO joke (content, funny_rating, content_hash) VALUES (?, ?, ?)",
+            [(f"Жарт {rating!r}", rating, text_hash(f"Жарт {rating!r}")) for rating in LEGACY_RATINGS]
+        )
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "legacy.db")
+        build_legacy_db(db_path)
+
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            applied = migrate(conn, batch_size=3, log=lambda message: None)
+            check(get_version(cursor) == LATEST_VERSION, f"schema version {get_version(cursor)}")
+            print(f"Applied migrations: {', '.join(applied)}")
+
+            ratings = dict(cursor.execute(
+                "SELECT b.content, j.funny_rating FROM joke j JOIN content_blobs b ON b.content_hash = j.content_hash"
+            ).fetchall())
+            for rating, expected in LEGACY_RATINGS.items():
+                actual = ratings.get(f"Жарт {rating!r}")
+                check(actual == expected, f"legacy rating {rating!r} became {actual!r}, expected {expected}")
+            check(table_columns(cursor, "joke")["funny_rating"] == "INTEGER", "joke.funny_rating is not INTEGER")
+
+            for table in ("news", "ads", "joke"):
+                check("content" not in table_columns(cursor, table), f"{table}.content was not removed")
+            blobs = cursor.execute("SELECT COUNT(*) FROM content_blobs").fetchone()[0]
+            check(blobs == 10 + len(LEGACY_RATINGS), f"{blobs} texts in content_blobs")
+            check(
+                cursor.execute("SELECT COUNT(*) FROM ads WHERE expires_on = '2026-08-10'").fetchone()[0] == 1,
+                "ads.expires_on was not filled"
+            )
+            check(migrate(conn, batch_size=3, log=lambda message: None) == [], "second run applied migrations")
+
+    print("Legacy database migrated correctly")
+
+
+if __name__ == "__main__":
+    main()
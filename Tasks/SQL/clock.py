@@ -0,0 +1,45 @@
+"""
+Clocks for content timestamps.
+
+Content objects take their creation time and the "days left" reference time
+from a clock instead of calling datetime.now() directly:
+
+- SystemClock reads the real time on every call.
+- CachedClock reads its source clock once and reuses that moment, so a whole
+  batch of records shares one timestamp.
+- FixedClock always returns the same moment, which keeps benchmarks and
+  generated output reproducible.
+"""
+
+from datetime import datetime
+
+
+class SystemClock:
+    def now(self):
+        return datetime.now()
+
+
+class CachedClock:
+    def __init__(self, source=None):
+        self.source = source or SYSTEM_CLOCK
+        self._moment = None
+
+    def now(self):
+        if self._moment is None:
+            self._moment = self.source.now()
+        return self._moment
+
+    def refresh(self):
+        """Forgets the cached moment; the next now() reads the source clock again."""
+        self._moment = None
+
+
+class FixedClock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def now(self):
+        return self.moment
+
+
+SYSTEM_CLOCK = SystemClock()
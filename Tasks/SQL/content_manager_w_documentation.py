@@ -23,6 +23,7 @@ import hashlib
 from csv_word_count_v2 import generate_words_csv
 from csv_word_count_v2 import generate_letters_csv
 from xml.etree import ElementTree as ET
+from text_normalizer import DEFAULT_NORMALIZER
 
 def normalize_text(text: str) -> str:
     """
@@ -34,8 +35,7 @@ def normalize_text(text: str) -> str:
     Returns:
         str: Normalized text
     """
-    text = ' '.join(text.split())
-    return text[0].upper() + text[1:] if text else text
+    return DEFAULT_NORMALIZER.normalize(text)
 
 class DBManager:
     """
@@ -0,0 +1,225 @@
+"""
+Streaming generator of load-test corpora.
+
+Records are written to every output file as soon as they are generated, so
+memory use does not depend on the record count. Runs with the same --seed
+and --base-date (and the same parameters) produce the same corpus, with any
+--workers. All dates lie between --base-date and 30 days after it; without
+--base-date they start today, so the corpus also depends on the day it is made.
+
+Output formats:
+    txt   - generated_content.txt format (type / content / additional, '---' between records)
+    jsonl - one {"type", "content", "additional"} object per line
+    xml   - <content> root with <news>, <ad> and <joke> items as in content_storage.xml
+
+Usage:
+    python corpus_generator.py 1000000 --seed 42 --base-date 01-01-2025 --formats txt jsonl xml
+        --mix news=5,ad=3,joke=2 --length 50:400:120 --workers 4 --pools --output corpus
+"""
+
+from functools import partial
+from xml.etree import ElementTree as ET
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from db_contnent_generator import JOKES, generate_ad, seed_generator, use_value_pools
+import db_contnent_generator as generator
+from expiration_index import to_date
+from parallel_generation import iter_records
+
+RECORD_TYPES = ("news", "ad", "joke")
+
+# Faker не генерує текст коротший за 5 символів
+MIN_TEXT_LENGTH = 5
+
+
+def generate_corpus_record(types, weights, min_length, max_length, mode=None):
+    """
+    One record of the corpus.
+
+    Args:
+        types, weights: Record types and their relative weights.
+        min_length, max_length: Range of the news text length in characters.
+        mode: Most frequent length (triangular distribution); None for uniform.
+    """
+    record_type = random.choices(types, weights)[0]
+    if record_type == "news":
+        if mode is None:
+            length = random.randint(min_length, max_length)
+        else:
+            length = round(random.triangular(min_length, max_length, mode))
+        content = generator.values.text(max_nb_chars=max(length, MIN_TEXT_LENGTH))
+        additional = generator.values.city()
+    elif record_type == "ad":
+        content = generate_ad()
+        additional = generator.values.date().strftime('%d-%m-%Y')
+    else:
+        content = generator.values.choice(JOKES)
+        additional = str(random.randint(1, 10))
+    return [record_type, content, additional]
+
+
+class TxtWriter:
+    def __init__(self, filename):
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.first = True
+
+    def write(self, record):
+        if not self.first:
+            self.file.write("\n---\n")
+        self.file.write(f"{record[0]}\n{record[1]}\n{record[2]}")
+        self.first = False
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter:
+    def __init__(self, filename):
+        self.file = open(filename, 'w', encoding='utf-8')
+
+    def write(self, record):
+        item = {"type": record[0], "content": record[1], "additional": record[2]}
+        self.file.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class XmlWriter:
+    def __init__(self, filename):
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.file.write("<?xml version='1.0' encoding='utf-8'?>\n<content>\n")
+
+    def write(self, record):
+        record_type, content, additional = record
+        element = ET.Element(record_type)
+        ET.SubElement(element, "text").text = content
+        if record_type == "news":
+            ET.SubElement(element, "city").text = additional
+        elif record_type == "ad":
+            # У content_storage.xml дата записується як DD/MM/YYYY
+            ET.SubElement(element, "expiration_date").text = additional.replace("-", "/")
+        else:
+            ET.SubElement(element, "funny_rating").text = additional
+        self.file.write("  " + ET.tostring(element, encoding="unicode") + "\n")
+
+    def close(self):
+        self.file.write("</content>\n")
+        self.file.close()
+
+
+WRITERS = {
+    "txt": TxtWriter,
+    "jsonl": JsonlWriter,
+    "xml": XmlWriter,
+}
+
+
+def parse_mix(value):
+    """'news=5,ad=3,joke=2' -> (types, weights)."""
+    weights = dict.fromkeys(RECORD_TYPES, 0.0)
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise argparse.ArgumentTypeError(f"unknown record type in --mix: {name}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: {weight}")
+    if not any(weight > 0 for weight in weights.values()):
+        raise argparse.ArgumentTypeError("--mix needs at least one positive weight")
+    return tuple(weights), tuple(weights.values())
+
+
+def parse_length(value):
+    """'MIN:MAX' (uniform) or 'MIN:MAX:MODE' (triangular) -> (min, max, mode)."""
+    try:
+        numbers = [int(number) for number in value.split(":")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --length: {value}")
+    if len(numbers) not in (2, 3) or not numbers[0] <= numbers[1]:
+        raise argparse.ArgumentTypeError("--length must be MIN:MAX or MIN:MAX:MODE with MIN <= MAX")
+    if len(numbers) == 3 and not numbers[0] <= numbers[2] <= numbers[1]:
+        raise argparse.ArgumentTypeError("--length MODE must lie between MIN and MAX")
+    return numbers[0], numbers[1], numbers[2] if len(numbers) == 3 else None
+
+
+def parse_base_date(value):
+    """'DD-MM-YYYY' or 'YYYY-MM-DD' -> date."""
+    try:
+        return to_date(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --base-date: {value}")
+
+
+def generate_corpus(base_filename, num_records, formats=("txt",), mix=(RECORD_TYPES, (1, 1, 1)),
+                    length=(50, 200, None), seed=None, workers=1, unique=False, value_pools=False,
+                    base_date=None, progress_interval=1.0):
+    """Writes `num_records` records to base_filename.<format> for every format. Returns the record count.
+
+    Dates are drawn from base_date .. base_date + 30 days (today by default).
+    """
+    types, weights = mix
+    make_record = partial(generate_corpus_record, types, weights, *length)
+    # Джерело значень задається в цьому процесі та в кожному робочому процесі
+    records = iter_records(make_record, seed_generator, num_records, workers, seed, unique,
+                           setup=partial(use_value_pools, value_pools, to_date(base_date)))
+
+    writers = []
+    try:
+        for name in formats:
+            writers.append(WRITERS[name](f"{base_filename}.{name}"))
+
+        count = 0
+        start = last_report = time.perf_counter()
+        for record in records:
+            for writer in writers:
+                writer.write(record)
+            count += 1
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                print(f"\r{count:,}/{num_records:,} records, {count / (now - start):,.0f} records/s",
+                      end="", file=sys.stderr, flush=True)
+    finally:
+        records.close()
+        for writer in writers:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\r{count:,}/{num_records:,} records in {elapsed:.1f} s, {count / max(elapsed, 1e-9):,.0f} records/s",
+          file=sys.stderr)
+    return count
+
+
+def main():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Generate a load-test corpus of news, ads and jokes")
+    parser.add_argument("records", type=int, help="number of records")
+    parser.add_argument("--output", default=os.path.join(current_dir, "corpus"),
+                        help="base file name, the format is added as extension")
+    parser.add_argument("--formats", nargs="+", choices=list(WRITERS), default=["txt"])
+    parser.add_argument("--seed", type=int, help="seed for a reproducible corpus")
+    parser.add_argument("--base-date", type=parse_base_date,
+                        help="first day of generated dates (DD-MM-YYYY), today by default")
+    parser.add_argument("--mix", type=parse_mix, default="news=1,ad=1,joke=1",
+                        help="relative weights of the record types")
+    parser.add_argument("--length", type=parse_length, default="50:200",
+                        help="news text length: MIN:MAX (uniform) or MIN:MAX:MODE (triangular)")
+    parser.add_argument("--workers", type=int, default=1, help="generator processes, 0 for all CPUs")
+    parser.add_argument("--unique", action="store_true", help="skip records with repeated content")
+    parser.add_argument("--pools", action="store_true", help="draw values from pre-sampled pools (faster)")
+    args = parser.parse_args()
+
+    generate_corpus(args.output, args.records, args.formats, args.mix, args.length,
+                    args.seed, args.workers or None, args.unique, args.pools, args.base_date)
+
+
+if __name__ == "__main__":
+    main()
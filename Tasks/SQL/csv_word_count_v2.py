@@ -1,69 +1,284 @@
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import codecs
 import os
 import csv
 import re
 
+from heavy_hitters import MisraGries
+
+# NumPy необов'язковий: без нього літери рахуються чистим Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 current_dir = os.path.dirname(os.path.abspath(__file__))
 content_file = os.path.join(current_dir, "content_storage.txt")
 csv_words = os.path.join(current_dir, "csv_words.csv")
 csv_counter = os.path.join(current_dir, "csv_counts.csv")
 
-def analyze_words(filename):
-    if os.path.exists(content_file):
-        with open(filename, 'r', encoding="utf-8") as file:
-            content = file.read()
-        
-        words = re.findall(r'\b\w+\b', content.lower())
-        word_counter = Counter(words)
-        
-        return word_counter
+WORD_PATTERN = re.compile(r'\b\w+\b')
+STREAM_CHUNK_SIZE = 1024 * 1024
+PARALLEL_CHUNK_SIZE = 64 * 1024 * 1024
+
+def iter_text_chunks(filename, start=0, end=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Yields decoded text from a byte range of the file, at most chunk_size bytes at a time."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        remaining = (end if end is not None else os.path.getsize(filename)) - start
+        while remaining > 0:
+            data = file.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+def _is_word_char(char):
+    # Те саме, що \w у регулярних виразах Python
+    return char.isalnum() or char == '_'
+
+def iter_chunk_words(chunks):
+    """Streaming tokenizer: yields the word list of each chunk, carrying a word cut at the chunk end."""
+    carry = ''
+    for chunk in chunks:
+        chunk = carry + chunk
+        cut = len(chunk)
+        while cut and _is_word_char(chunk[cut - 1]):
+            cut -= 1
+        carry = chunk[cut:]
+        yield WORD_PATTERN.findall(chunk[:cut].lower())
+    if carry:
+        yield WORD_PATTERN.findall(carry.lower())
+
+def count_words_in_chunks(chunks):
+    word_counter = Counter()
+    for words in iter_chunk_words(chunks):
+        word_counter.update(words)
+    return word_counter
+
+def analyze_words(filename, chunk_size=STREAM_CHUNK_SIZE):
+    # Пам'ять обмежена розміром шматка, а не розміром файлу
+    if os.path.exists(filename):
+        return count_words_in_chunks(iter_text_chunks(filename, chunk_size=chunk_size))
     else: 
         return {}
 
-def analyze_letters(filename):
-    # Читаємо файл
-    with open(filename, 'r', encoding='utf-8') as file:
-        content = file.read()
-   
-    # Підраховуємо тільки літери
-    letters = [char for char in content if char.isalpha()]
-    letter_counter = Counter(letters)
-    
+def split_into_chunks(filename, chunk_size=PARALLEL_CHUNK_SIZE):
+    """Splits a file into (start, end) byte ranges that begin right after a newline.
+
+    Слово не може містити переносу рядка, тому жодне слово не розрізається між шматками.
+    """
+    size = os.path.getsize(filename)
+    ranges = []
+    start = 0
+    with open(filename, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def count_words_in_range(filename, start, end):
+    return count_words_in_chunks(iter_text_chunks(filename, start, end))
+
+def _count_words_task(task):
+    return count_words_in_range(*task)
+
+def analyze_words_parallel(filename, workers=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """Map-reduce word count: chunks are tokenized in a process pool and the Counters are merged."""
+    if not os.path.exists(filename):
+        return {}
+    workers = workers or os.cpu_count() or 1
+    tasks = [(filename, start, end) for start, end in split_into_chunks(filename, chunk_size)]
+    word_counter = Counter()
+    if len(tasks) <= 1 or workers == 1:
+        for task in tasks:
+            word_counter.update(_count_words_task(task))
+        return word_counter
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_count_words_task, tasks):
+            word_counter.update(partial)
+    return word_counter
+
+DEFAULT_TOP_K = 100
+
+def analyze_top_words(filename, k=DEFAULT_TOP_K, capacity=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Approximate top-k words in fixed memory (Misra-Gries with `capacity` counters, 10 * k by default).
+
+    Returns a list of (word, estimated count, max error).
+    """
+    if not os.path.exists(filename):
+        return []
+    summary = MisraGries(capacity or 10 * k)
+    for words in iter_chunk_words(iter_text_chunks(filename, chunk_size=chunk_size)):
+        summary.update(Counter(words))
+    return summary.top(k)
+
+def letter_stats_from_counts(letter_counter):
     # Загальна кількість літер для відсотків
-    total_letters = len(letters)
-   
-    # Створюємо розширений словник зі статистикою
+    total_letters = sum(letter_counter.values())
+
+    # Створюємо розширений словник зі статистикою.
+    # Велика літера теж є ключем у лічильнику, тому uppercase - це просто пошук у словнику
     letter_stats = {}
     for letter, count in letter_counter.items():
         letter_stats[letter] = {
             'count': count,
-            'uppercase': sum(1 for c in content if c == letter.upper()),
+            'uppercase': letter_counter.get(letter.upper(), 0),
             'percentage': round((count / total_letters) * 100, 2)
         }
-   
+
     return letter_stats
+
+def count_letters_python(chunks):
+    # Один прохід по тексту: рахуємо всі символи, потім залишаємо тільки літери
+    char_counter = Counter()
+    for chunk in chunks:
+        char_counter.update(chunk)
+    return Counter({char: count for char, count in char_counter.items() if char.isalpha()})
+
+_alpha_codepoints = None
+
+def _is_alpha_table():
+    # Класифікація всіх символів BMP рахується один раз на процес
+    global _alpha_codepoints
+    if _alpha_codepoints is None:
+        _alpha_codepoints = np.fromiter((chr(cp).isalpha() for cp in range(0x10000)), dtype=bool, count=0x10000)
+    return _alpha_codepoints
+
+def count_letters_numpy(chunks):
+    """Histogram of codepoints with np.bincount, then only alphabetic codepoints are kept."""
+    histogram = np.zeros(0x10000, dtype=np.int64)
+    for chunk in chunks:
+        codepoints = np.frombuffer(chunk.encode('utf-32-le'), dtype='<u4')
+        counts = np.bincount(codepoints, minlength=len(histogram))
+        if len(counts) > len(histogram):
+            counts[:len(histogram)] += histogram
+            histogram = counts
+        else:
+            histogram += counts
+
+    present = np.flatnonzero(histogram)
+    alpha = _is_alpha_table()
+    letter_counter = Counter()
+    for cp in present.tolist():
+        char = chr(cp)
+        if (alpha[cp] if cp < len(alpha) else char.isalpha()):
+            letter_counter[char] = int(histogram[cp])
+    return letter_counter
+
+def analyze_letters(filename, use_numpy=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Letter statistics for csv_counts.csv; uses NumPy when it is installed unless use_numpy=False."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    chunks = iter_text_chunks(filename, chunk_size=chunk_size)
+    letter_counter = count_letters_numpy(chunks) if use_numpy else count_letters_python(chunks)
+    return letter_stats_from_counts(letter_counter)
 # letter_stats - словник із вкладеним словником 
 # {'літера' : {'count': кількість, 'uppercase': кількість, 'percentage': кількість}}
 
-# Використання
-words = analyze_words(content_file)
-letters = analyze_letters(content_file)
+# Результати аналізу кешуються за розміром і часом зміни файлу,
+# тому імпорт модуля нічого не читає, а повторний виклик для незміненого файлу безкоштовний
+_analysis_cache = {}
+_generated_from = {}
+
+def file_signature(filename):
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _cached(kind, analyze, filename):
+    signature = file_signature(filename)
+    key = (kind, filename)
+    cached = _analysis_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    result = analyze(filename) if signature is not None else {}
+    _analysis_cache[key] = (signature, result)
+    return result
+
+def get_words(filename=content_file, workers=1):
+    if workers == 1:
+        return _cached("words", analyze_words, filename)
+    return _cached("words", lambda name: analyze_words_parallel(name, workers), filename)
+
+def get_top_words(filename=content_file, k=DEFAULT_TOP_K, capacity=None):
+    return _cached(("top_words", k, capacity), lambda name: analyze_top_words(name, k, capacity), filename)
+
+def get_letters(filename=content_file):
+    return _cached("letters", analyze_letters, filename)
+
+def __getattr__(name):
+    # Сумісність зі старими знімками csv_word_count_v2.words / .letters
+    if name == "words":
+        return get_words()
+    if name == "letters":
+        return get_letters()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Записуємо в csv
-def generate_words_csv():
-    with open(csv_words, "w", encoding="utf-8") as csvfile:
+def write_words_csv(word_counter, filename=csv_words):
+    with open(filename, "w", encoding="utf-8") as csvfile:
         writer = csv.writer(csvfile, delimiter=":", quoting=csv.QUOTE_ALL)
         writer.writerow(['word', 'count'])
-        for word, vcount in sorted(words.items()):
+        for word, vcount in sorted(word_counter.items()):
             writer.writerow([word, vcount])
 
-def generate_letters_csv():
-    with open(csv_counter, 'w', encoding="utf-8") as csvfile:
+def write_top_words_csv(top_words, filename=csv_words):
+    # Наближений режим: найчастіші слова першими та межа похибки для кожного
+    with open(filename, "w", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile, delimiter=":", quoting=csv.QUOTE_ALL)
+        writer.writerow(['word', 'count', 'max_error'])
+        for word, vcount, error in top_words:
+            writer.writerow([word, vcount, error])
+
+def write_letters_csv(letter_stats, filename=csv_counter):
+    with open(filename, 'w', encoding="utf-8") as csvfile:
         writer = csv.writer(csvfile, delimiter=":", quoting=csv.QUOTE_ALL)
         writer.writerow(['letter', 'count_all', 'count_uppercase', 'percentage'])
-        for letter, stat in sorted(letters.items()):
+        for letter, stat in sorted(letter_stats.items()):
             writer.writerow([letter, stat['count'], stat['uppercase'], stat['percentage']])
 
-generate_words_csv()
-generate_letters_csv()
+def _is_up_to_date(csv_filename, filename, variant=None):
+    signature = file_signature(filename)
+    return os.path.exists(csv_filename) and _generated_from.get(csv_filename) == (signature, variant)
+
+def generate_words_csv(filename=content_file, workers=1, mode="exact", top_k=DEFAULT_TOP_K):
+    """Rewrites csv_words.csv unless the store is unchanged since the last run. Returns True if written.
+
+    mode="exact" writes every word; workers > 1 (or None for all cores) counts them in parallel.
+    mode="top_k" writes only the top_k words with error bounds, using fixed memory.
+    """
+    variant = (mode, top_k) if mode == "top_k" else None
+    if _is_up_to_date(csv_words, filename, variant):
+        return False
+    signature = file_signature(filename)
+    if mode == "top_k":
+        write_top_words_csv(get_top_words(filename, top_k))
+    elif mode == "exact":
+        write_words_csv(get_words(filename, workers))
+    else:
+        raise ValueError(f"Unknown analytics mode: {mode}")
+    _generated_from[csv_words] = (signature, variant)
+    return True
+
+def generate_letters_csv(filename=content_file):
+    """Rewrites csv_counts.csv unless the store is unchanged since the last run. Returns True if written."""
+    if _is_up_to_date(csv_counter, filename):
+        return False
+    signature = file_signature(filename)
+    write_letters_csv(get_letters(filename))
+    _generated_from[csv_counter] = (signature, None)
+    return True
+
+if __name__ == "__main__":
+    generate_words_csv()
+    generate_letters_csv()
 
@@ -0,0 +1,236 @@
+"""
+Word and letter statistics computed from the content tables.
+
+Unlike csv_word_count_v2, which scans the rendered content_storage.txt, this
+module reads only the stored texts of news, ads and jokes, so headers such as
+"News -------", "Actual until", "days left" or "Funny meter" are not counted.
+
+Counts are cached in the database per group (content type + creation day).
+Each update reads only rows added since the last update (tracked per table by
+id) and adds their counts to the affected groups; other groups are untouched.
+Code that deletes records calls subtract_records() in the same transaction.
+"""
+
+from collections import Counter, defaultdict
+
+from csv_word_count_v2 import WORD_PATTERN, letter_stats_from_counts, write_words_csv, write_letters_csv
+
+# Тип контенту -> таблиця
+TYPE_TABLES = {
+    "news": "news",
+    "ad": "ads",
+    "joke": "joke",
+}
+
+UNKNOWN_DAY = "unknown"
+
+
+def group_counts(rows):
+    """Word and letter Counters per creation day of (id, created_at, content) rows."""
+    words = defaultdict(Counter)
+    chars = defaultdict(Counter)
+    for _, created_at, content in rows:
+        day = created_at[:10] if created_at else UNKNOWN_DAY
+        words[day].update(WORD_PATTERN.findall(content.lower()))
+        chars[day].update(content)
+    letters = {
+        day: {char: count for char, count in counter.items() if char.isalpha()}
+        for day, counter in chars.items()
+    }
+    return words, letters
+
+
+def add_counts(cursor, content_type, words, letters, sign=1):
+    """Adds (sign=1) or subtracts (sign=-1) grouped counts; groups that drop to zero are deleted."""
+    for table, column, counters in (("analytics_words", "word", words), ("analytics_letters", "letter", letters)):
+        params = [
+            (content_type, day, key, sign * count)
+            for day, counter in counters.items() for key, count in counter.items()
+        ]
+        cursor.executemany(
+            f"""
+            INSERT INTO {table} (content_type, day, {column}, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT (content_type, day, {column}) DO UPDATE SET count = count + excluded.count
+            """,
+            params
+        )
+        if sign < 0:
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE content_type = ? AND day = ? AND {column} = ? AND count <= 0",
+                [param[:3] for param in params]
+            )
+
+
+def subtract_records(cursor, content_type, rows):
+    """
+    Removes deleted records from the cached counts, in the caller's transaction.
+
+    `rows` are (id, created_at, content) of the deleted records. Records that
+    the analytics has not counted yet (id above its last_id) are skipped.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'analytics_progress'")
+    if cursor.fetchone() is None:
+        return
+    cursor.execute("SELECT last_id FROM analytics_progress WHERE content_type = ?", (content_type,))
+    row = cursor.fetchone()
+    last_id = row[0] if row else 0
+    counted = [record for record in rows if record[0] <= last_id]
+    if counted:
+        add_counts(cursor, content_type, *group_counts(counted), sign=-1)
+
+
+class DBAnalytics:
+    def __init__(self, db_manager, batch_size=1000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.create_tables()
+
+    def create_tables(self):
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_words (
+                content_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (content_type, day, word)
+            ) WITHOUT ROWID;
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_letters (
+                content_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                letter TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (content_type, day, letter)
+            ) WITHOUT ROWID;
+            """)
+            # Останній оброблений id для кожної таблиці
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_progress (
+                content_type TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL
+            );
+            """)
+            conn.commit()
+
+    def update(self):
+        """Folds rows added since the last update into their groups. Returns the number of rows."""
+        processed = 0
+        for content_type in TYPE_TABLES:
+            while True:
+                count = self._update_batch(content_type)
+                processed += count
+                if count < self.batch_size:
+                    break
+        return processed
+
+    def _update_batch(self, content_type):
+        table = TYPE_TABLES[content_type]
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT last_id FROM analytics_progress WHERE content_type = ?", (content_type,))
+            row = cursor.fetchone()
+            last_id = row[0] if row else 0
+
+            cursor.execute(
+                f"""
+                SELECT t.id, t.created_at, b.content
+                FROM {table} t JOIN content_blobs b ON b.content_hash = t.content_hash
+                WHERE t.id > ?
+                ORDER BY t.id
+                LIMIT ?
+                """,
+                (last_id, self.batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+
+            last_id = rows[-1][0]
+            add_counts(cursor, content_type, *group_counts(rows))
+            cursor.execute(
+                """
+                INSERT INTO analytics_progress (content_type, last_id) VALUES (?, ?)
+                ON CONFLICT (content_type) DO UPDATE SET last_id = excluded.last_id
+                """,
+                (content_type, last_id)
+            )
+            conn.commit()
+            return len(rows)
+
+    def rebuild(self):
+        """Drops all cached groups and recounts every stored record (e.g. after records were deleted)."""
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM analytics_words")
+            cursor.execute("DELETE FROM analytics_letters")
+            cursor.execute("DELETE FROM analytics_progress")
+            conn.commit()
+        return self.update()
+
+    def _group_filter(self, content_type, day_from, day_to):
+        conditions = []
+        params = []
+        if content_type:
+            conditions.append("content_type = ?")
+            params.append(content_type)
+        if day_from or day_to:
+            conditions.append("day <> ?")
+            params.append(UNKNOWN_DAY)
+        if day_from:
+            conditions.append("day >= ?")
+            params.append(day_from)
+        if day_to:
+            conditions.append("day <= ?")
+            params.append(day_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def word_counts(self, content_type=None, day_from=None, day_to=None):
+        """Word Counter for a content type and/or an inclusive 'YYYY-MM-DD' day range."""
+        where, params = self._group_filter(content_type, day_from, day_to)
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT word, SUM(count) FROM analytics_words {where} GROUP BY word", params)
+            return Counter(dict(cursor.fetchall()))
+
+    def letter_stats(self, content_type=None, day_from=None, day_to=None):
+        """Letter statistics in the csv_counts.csv shape for the selected groups."""
+        where, params = self._group_filter(content_type, day_from, day_to)
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT letter, SUM(count) FROM analytics_letters {where} GROUP BY letter", params)
+            return letter_stats_from_counts(Counter(dict(cursor.fetchall())))
+
+    def counts_per_group(self):
+        """Number of words per (content type, day) group."""
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT content_type, day, SUM(count) FROM analytics_words "
+                "GROUP BY content_type, day ORDER BY day, content_type"
+            )
+            return cursor.fetchall()
+
+    def export_csv(self, words_filename, letters_filename, content_type=None, day_from=None, day_to=None):
+        write_words_csv(self.word_counts(content_type, day_from, day_to), words_filename)
+        write_letters_csv(self.letter_stats(content_type, day_from, day_to), letters_filename)
+
+
+if __name__ == "__main__":
+    import os
+    from db_content_manager import DBManager
+
+    analytics = DBAnalytics(DBManager())
+    print(f"Processed {analytics.update()} new records")
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    for content_type in TYPE_TABLES:
+        analytics.export_csv(
+            os.path.join(current_dir, f"csv_words_{content_type}.csv"),
+            os.path.join(current_dir, f"csv_counts_{content_type}.csv"),
+            content_type
+        )
+    for content_type, day, words in analytics.counts_per_group():
+        print(f"{day} {content_type}: {words} words")
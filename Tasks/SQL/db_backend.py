@@ -0,0 +1,62 @@
+"""
+Database backends for the content DB.
+
+sqlite3 - the stdlib module, no driver needed (default)
+pyodbc  - the "SQLite3 ODBC Driver", as in the lessons
+
+Both open the same SQLite file and return DB-API connections, so the SQL in
+DBManager does not depend on the backend. Database errors are caught through
+`backend.Error` instead of a driver-specific exception class.
+"""
+
+import sqlite3
+
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
+DEFAULT_BACKEND = "sqlite3"
+
+
+class SQLiteBackend:
+    name = "sqlite3"
+    Error = sqlite3.Error
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+
+class PyodbcBackend:
+    name = "pyodbc"
+
+    def __init__(self, db_path):
+        if pyodbc is None:
+            raise ImportError("pyodbc is not installed, use the sqlite3 backend")
+        self.Error = pyodbc.Error
+        self.db_path = db_path
+        self.connection_string = f'DRIVER={{SQLite3 ODBC Driver}};Direct=True;Database={db_path};String Types=Unicode'
+
+    def connect(self):
+        conn = pyodbc.connect(self.connection_string)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+
+BACKENDS = {
+    SQLiteBackend.name: SQLiteBackend,
+    PyodbcBackend.name: PyodbcBackend,
+}
+
+
+def get_backend(db_path, name=None):
+    """Creates the backend called `name` ('sqlite3' or 'pyodbc') for a database file."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](db_path)
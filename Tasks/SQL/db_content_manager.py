@@ -1,117 +1,482 @@
+from collections import namedtuple
 from datetime import datetime
+from itertools import islice
+import heapq
 import os
 import json
-import pyodbc
 import hashlib
-from csv_word_count_v2 import generate_words_csv
-from csv_word_count_v2 import generate_letters_csv
+from clock import CachedClock, SYSTEM_CLOCK
+from expiration_index import ExpirationIndex, to_date
+from text_normalizer import normalize_text
+from incremental_stats import IncrementalStats
+from db_analytics import DBAnalytics, subtract_records
+from db_backend import get_backend
+from db_migrations import migrate
+from db_unified import is_unified
+from near_duplicates import DEFAULT_THRESHOLD, POLICIES, SQLiteLSHIndex
+from stats_worker import StatsWorker
 from xml.etree import ElementTree as ET
 
-def normalize_text(text):
-    text = ' '.join(text.split())
-    return text[0].upper() + text[1:] if text else text
+# Тип запису, таблиця та колонка з додатковою інформацією для пошуку
+SEARCH_TABLES = (
+    ("news", "news", "city"),
+    ("ad", "ads", "expiration_date"),
+    ("joke", "joke", "funny_rating"),
+)
+
+# ISO формат - рядки сортуються так само, як дати
+CREATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Запис стрічки: additional - місто, дата закінчення або рейтинг
+FeedItem = namedtuple("FeedItem", ["type", "id", "created_at", "content", "additional"])
+
+# Скільки рядків за раз читати з курсора стрічки
+FEED_FETCH_SIZE = 100
+
+
+def feed_key(item):
+    """Sort key of the feed; records without created_at (saved before it existed) go last."""
+    return (item.created_at is not None, item.created_at or "", item.type, item.id)
+
+
+def feed_cursor(item):
+    """Keyset position after `item`, to pass as `after` for the next page."""
+    return (item.created_at, item.type, item.id)
+
 
 class DBManager:
-    def __init__(self):
+    def __init__(self, db_path=None, backend=None, near_duplicates=None, threshold=DEFAULT_THRESHOLD):
+        """
+        `backend` is 'sqlite3' (default) or 'pyodbc', see db_backend.py.
+        `near_duplicates` is None (exact check only), 'flag' or 'reject': what to do
+        with a text at least `threshold` similar to a stored one, see near_duplicates.py.
+        """
+        if near_duplicates not in (None, *POLICIES):
+            raise ValueError(f"Unknown near-duplicate policy: {near_duplicates}")
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.db_path = os.path.join(current_dir, "content_storage.db")
-        self.connection_string = f'DRIVER={{SQLite3 ODBC Driver}};Direct=True;Database={self.db_path};String Types=Unicode'
+        self.db_path = db_path or os.path.join(current_dir, "content_storage.db")
+        self.backend = get_backend(self.db_path, backend)
+        self.near_duplicates = near_duplicates
+        self.lsh = SQLiteLSHIndex(threshold) if near_duplicates else None
         self.create_tables()
+        if self.lsh:
+            self.index_near_duplicates()
 
     def get_connection(self):
-        return pyodbc.connect(self.connection_string)
+        return self.backend.connect()
 
     def create_tables(self):
+        # Схема створюється та оновлюється міграціями (див. db_migrations.py)
+        with self.get_connection() as conn:
+            migrate(conn)
+            # Одна таблиця content замість news, ads і joke (див. db_unified.py)
+            self.unified = is_unified(conn.cursor())
+
+        self.fts_enabled = self.create_fts_index()
+
+    def create_fts_index(self):
+        """Creates the FTS5 index over content_blobs, kept current by triggers.
+
+        Returns False when the SQLite build has no FTS5 module.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'content_fts'")
+            exists = cursor.fetchone() is not None
+            try:
+                # External content: текст зберігається лише в content_blobs
+                cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5 (
+                    content,
+                    content = 'content_blobs',
+                    tokenize = 'unicode61 remove_diacritics 0'
+                );
+                """)
+            except self.backend.Error as e:
+                if 'no such module' in str(e):
+                    print("Warning: SQLite has no FTS5 support, full-text search is disabled")
+                    return False
+                raise
+
             cursor.execute("""
-            CREATE TABLE IF NOT EXISTS news (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                city TEXT NOT NULL,
-                content_hash TEXT NOT NULL UNIQUE
-            );
+            CREATE TRIGGER IF NOT EXISTS content_blobs_fts_insert AFTER INSERT ON content_blobs BEGIN
+                INSERT INTO content_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
             """)
-
             cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                expiration_date TEXT NOT NULL,
-                content_hash TEXT NOT NULL UNIQUE
-            );
+            CREATE TRIGGER IF NOT EXISTS content_blobs_fts_delete AFTER DELETE ON content_blobs BEGIN
+                INSERT INTO content_fts (content_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+            END;
             """)
-
             cursor.execute("""
-            CREATE TABLE IF NOT EXISTS joke (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                funny_rating TEXT NOT NULL,
-                content_hash TEXT NOT NULL UNIQUE
-            );
+            CREATE TRIGGER IF NOT EXISTS content_blobs_fts_update AFTER UPDATE ON content_blobs BEGIN
+                INSERT INTO content_fts (content_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+                INSERT INTO content_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
             """)
-            
+            cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS content_fts_vocab USING fts5vocab (content_fts, 'row');
+            """)
+            if not exists:
+                # Індексуємо тексти, збережені до появи FTS
+                cursor.execute("INSERT INTO content_fts (content_fts) VALUES ('rebuild')")
             conn.commit()
+        return True
 
     def get_content_hash(self, content):
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-    def save_news(self, text, city):
-        content_hash = self.get_content_hash(text)
+    def content_exists(self, text):
+        """Primary-key probe: is this exact text already stored under any type?"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "INSERT INTO news (content, city, content_hash) VALUES (?, ?, ?)",
-                    (text, city, content_hash)
-                )
-                conn.commit()
-                return True
-            except pyodbc.Error as e:
-                if 'UNIQUE constraint failed' in str(e):
-                    print("Warning: This news content already exists in the database")
-                    return False
-                raise
+            cursor.execute(
+                "SELECT 1 FROM content_blobs WHERE content_hash = ?",
+                (self.get_content_hash(text),)
+            )
+            return cursor.fetchone() is not None
 
-    def save_ad(self, text, expiration_date):
+    def get_content(self, content_hash):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT content FROM content_blobs WHERE content_hash = ?", (content_hash,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def save_record(self, table, values, text, label):
         content_hash = self.get_content_hash(text)
+        columns = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
+                signature = None
+                similar = None
+                if self.lsh:
+                    cursor.execute("SELECT 1 FROM content_blobs WHERE content_hash = ?", (content_hash,))
+                    if cursor.fetchone() is None:
+                        # Новий текст: шукаємо схожі серед збережених
+                        signature = self.lsh.signature(text)
+                        similar = self.lsh.find_similar(cursor, signature)
+                        if similar and self.near_duplicates == "reject":
+                            print(f"Warning: This {label} content is {similar[1]:.0%} similar to stored content")
+                            return False
+                cursor.execute(
+                    "INSERT OR IGNORE INTO content_blobs (content_hash, content) VALUES (?, ?)",
+                    (content_hash, text)
+                )
                 cursor.execute(
-                    "INSERT INTO ads (content, expiration_date, content_hash) VALUES (?, ?, ?)",
-                    (text, expiration_date, content_hash)
+                    f"INSERT INTO {table} ({columns}, content_hash) VALUES ({placeholders}, ?)",
+                    (*values.values(), content_hash)
                 )
+                if signature is not None:
+                    self.lsh.add(cursor, content_hash, signature)
+                if similar:
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO near_duplicates (content_hash, similar_to, similarity) VALUES (?, ?, ?)",
+                        (content_hash, *similar)
+                    )
+                    print(f"Warning: This {label} content is {similar[1]:.0%} similar to stored content, flagged")
                 conn.commit()
                 return True
-            except pyodbc.Error as e:
+            except self.backend.Error as e:
                 if 'UNIQUE constraint failed' in str(e):
-                    print("Warning: This ad content already exists in the database")
+                    conn.rollback()
+                    print(f"Warning: This {label} content already exists in the database")
                     return False
                 raise
 
-    def save_joke(self, text, funny_rating):
-        content_hash = self.get_content_hash(text)
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            try:
+    def index_near_duplicates(self, batch_size=1000):
+        """Adds MinHash signatures for stored texts that have none yet (saved without the index)."""
+        indexed = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
                 cursor.execute(
-                    "INSERT INTO joke (content, funny_rating, content_hash) VALUES (?, ?, ?)",
-                    (text, funny_rating, content_hash)
+                    """
+                    SELECT b.content_hash, b.content
+                    FROM content_blobs b LEFT JOIN minhash_signatures s ON s.content_hash = b.content_hash
+                    WHERE s.content_hash IS NULL
+                    LIMIT ?
+                    """,
+                    (batch_size,)
                 )
+                rows = cursor.fetchall()
+                for content_hash, content in rows:
+                    self.lsh.add(cursor, content_hash, self.lsh.signature(content))
                 conn.commit()
-                return True
-            except pyodbc.Error as e:
-                if 'UNIQUE constraint failed' in str(e):
-                    print("Warning: This joke content already exists in the database")
-                    return False
-                raise
+            indexed += len(rows)
+            if len(rows) < batch_size:
+                return indexed
+
+    def get_near_duplicates(self):
+        """Flagged texts as (content, similar stored content, similarity) tuples."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT b.content, s.content, n.similarity
+                FROM near_duplicates n
+                JOIN content_blobs b ON b.content_hash = n.content_hash
+                JOIN content_blobs s ON s.content_hash = n.similar_to
+                ORDER BY n.similarity DESC
+                """
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def format_created_at(self, created_at):
+        return (created_at or datetime.now()).strftime(CREATED_AT_FORMAT)
+
+    def save_news(self, text, city, created_at=None):
+        values = {"city": city, "created_at": self.format_created_at(created_at)}
+        return self.save_record("news", values, text, "news")
+
+    def save_ad(self, text, expiration_date, created_at=None):
+        values = {
+            "expiration_date": expiration_date,
+            "expires_on": to_date(expiration_date).isoformat(),
+            "created_at": self.format_created_at(created_at),
+        }
+        return self.save_record("ads", values, text, "ad")
+
+    def save_joke(self, text, funny_rating, created_at=None):
+        values = {"funny_rating": funny_rating, "created_at": self.format_created_at(created_at)}
+        return self.save_record("joke", values, text, "joke")
+
+    def get_active_ads(self, as_of=None):
+        """Ads still valid on `as_of`, soonest to expire first (index range scan on expires_on)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT b.content, a.expiration_date
+                FROM ads a JOIN content_blobs b ON b.content_hash = a.content_hash
+                WHERE a.expires_on >= ?
+                ORDER BY a.expires_on
+                """,
+                (to_date(as_of).isoformat(),)
+            )
+            return [(content, expiration_date) for content, expiration_date in cursor.fetchall()]
+
+    def purge_expired_ads(self, as_of=None):
+        """Deletes ads that expired before `as_of` and texts no other record uses."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT a.id, a.created_at, b.content, a.content_hash
+                FROM ads a JOIN content_blobs b ON b.content_hash = a.content_hash
+                WHERE a.expires_on < ?
+                """,
+                (to_date(as_of).isoformat(),)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+            # Лічильники аналітики зменшуються в тій самій транзакції
+            subtract_records(cursor, "ad", [row[:3] for row in rows])
+            cursor.executemany("DELETE FROM ads WHERE id = ?", [(row[0],) for row in rows])
+            self.delete_unused_blobs(cursor, [row[3] for row in rows])
+            conn.commit()
+            return len(rows)
+
+    def delete_unused_blobs(self, cursor, hashes):
+        """Deletes the texts among `hashes` that no news, ad or joke uses any more (in the caller's transaction)."""
+        unused = " ".join(
+            f"AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.content_hash = content_blobs.content_hash)"
+            for _, table, _ in SEARCH_TABLES
+        )
+        cursor.executemany(
+            f"DELETE FROM content_blobs WHERE content_hash = ? {unused}",
+            [(content_hash,) for content_hash in hashes]
+        )
+
+    def search(self, query, content_type=None, limit=20):
+        """Full-text search over stored content, best matches first.
+
+        Returns (type, content, additional info) tuples. Every word of the query
+        must occur in the text; words are matched as typed, not as FTS syntax.
+        """
+        if not self.fts_enabled:
+            return []
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+        if not match:
+            return []
+        selects = []
+        params = []
+        for record_type, table, column in SEARCH_TABLES:
+            if content_type and content_type != record_type:
+                continue
+            selects.append(f"""
+                SELECT '{record_type}', b.content, t.{column}, f.rank
+                FROM content_fts f
+                JOIN content_blobs b ON b.rowid = f.rowid
+                JOIN {table} t ON t.content_hash = b.content_hash
+                WHERE content_fts MATCH ?
+            """)
+            params.append(match)
+        if not selects:
+            # Невідомий тип контенту - як і в iter_feed, нічого не знайдено
+            return []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(" UNION ALL ".join(selects) + " ORDER BY 4 LIMIT ?", (*params, limit))
+            return [(record_type, content, additional) for record_type, content, additional, _ in cursor.fetchall()]
+
+    def _feed_conditions(self, record_type, after):
+        """WHERE parts of one table for the rows that come after the `after` key.
+
+        Rows with created_at go first (index range scan, newest first), then the
+        old rows without it. Returns a list of (condition, params) segments.
+        """
+        if after is None:
+            return [("t.created_at IS NOT NULL", []), ("t.created_at IS NULL", [])]
+        created_at, after_type, after_id = after
+        if created_at is None:
+            if record_type == after_type:
+                return [("t.created_at IS NULL AND t.id < ?", [after_id])]
+            return [("t.created_at IS NULL", [])] if record_type < after_type else []
+        if record_type == after_type:
+            segment = ("t.created_at <= ? AND (t.created_at < ? OR t.id < ?)", [created_at, created_at, after_id])
+        elif record_type < after_type:
+            # Той самий час, але тип іде далі в порядку стрічки
+            segment = ("t.created_at <= ?", [created_at])
+        else:
+            segment = ("t.created_at < ?", [created_at])
+        return [segment, ("t.created_at IS NULL", [])]
+
+    def _feed_table(self, conn, record_type, table, column, after, filters, limit):
+        """Streams FeedItems of one table in feed order."""
+        where = "".join(f" AND {condition}" for condition, _ in filters)
+        filter_params = [param for _, param in filters]
+        for condition, params in self._feed_conditions(record_type, after):
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT '{record_type}', t.id, t.created_at, b.content, t.{column}
+                FROM {table} t JOIN content_blobs b ON b.content_hash = t.content_hash
+                WHERE {condition}{where}
+                ORDER BY t.created_at DESC, t.id DESC
+                {"LIMIT ?" if limit else ""}
+                """,
+                (*params, *filter_params, *([limit] if limit else []))
+            )
+            while True:
+                rows = cursor.fetchmany(FEED_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield FeedItem(*row)
+
+    def _unified_feed(self, conn, after, filters, limit):
+        """Streams FeedItems from the content table: one query over idx_content_feed, no merge."""
+        if after is None:
+            segments = [("c.created_at IS NOT NULL", []), ("c.created_at IS NULL", [])]
+        elif after[0] is None:
+            segments = [("c.created_at IS NULL AND (c.type, c.id) < (?, ?)", list(after[1:]))]
+        else:
+            segments = [
+                ("c.created_at <= ? AND (c.created_at, c.type, c.id) < (?, ?, ?)", [after[0], *after]),
+                ("c.created_at IS NULL", []),
+            ]
+        where = "".join(f" AND {condition}" for condition, _ in filters)
+        filter_params = [param for _, params in filters for param in params]
+        for condition, params in segments:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT c.type, c.id, c.created_at, b.content,
+                    CASE c.type WHEN 'news' THEN c.city WHEN 'ad' THEN c.expiration_date ELSE c.funny_rating END
+                FROM content c JOIN content_blobs b ON b.content_hash = c.content_hash
+                WHERE {condition}{where}
+                ORDER BY c.created_at DESC, c.type DESC, c.id DESC
+                {"LIMIT ?" if limit else ""}
+                """,
+                (*params, *filter_params, *([limit] if limit else []))
+            )
+            while True:
+                rows = cursor.fetchmany(FEED_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield FeedItem(*row)
+
+    def iter_feed(self, after=None, content_type=None, city=None, active_only=False, as_of=None, limit=None):
+        """News, ads and jokes merged into one feed, newest first.
+
+        Every table is read with an index scan in feed order and the streams are
+        merged, so only the rows that are actually consumed get fetched. With the
+        unified content table the feed is a single index scan.
+
+        Args:
+            after: feed_cursor() of the last item already shown, None to start from the top.
+            content_type: 'news', 'ad' or 'joke'.
+            city: Only news from this city.
+            active_only: Skip ads that expired before `as_of` (today by default).
+            limit: Maximum number of items.
+        """
+        if self.unified:
+            filters = []
+            if content_type:
+                filters.append(("c.type = ?", [content_type]))
+            if city is not None:
+                filters.append(("c.type = 'news' AND c.city = ?", [city]))
+            if active_only:
+                filters.append(("(c.type <> 'ad' OR c.expires_on >= ?)", [to_date(as_of).isoformat()]))
+            with self.get_connection() as conn:
+                yield from islice(self._unified_feed(conn, after, filters, limit), limit)
+            return
+
+        tables = []
+        for record_type, table, column in SEARCH_TABLES:
+            if content_type and content_type != record_type:
+                continue
+            filters = []
+            if city is not None:
+                if record_type != "news":
+                    continue
+                filters.append(("t.city = ?", city))
+            if active_only and record_type == "ad":
+                filters.append(("t.expires_on >= ?", to_date(as_of).isoformat()))
+            tables.append((record_type, table, column, filters))
+
+        with self.get_connection() as conn:
+            streams = [
+                self._feed_table(conn, record_type, table, column, after, filters, limit)
+                for record_type, table, column, filters in tables
+            ]
+            yield from islice(heapq.merge(*streams, key=feed_key, reverse=True), limit)
+
+    def get_feed_page(self, limit=20, after=None, **filters):
+        """One page of iter_feed(). Returns (items, next_after); next_after is None on the last page."""
+        items = list(self.iter_feed(after, limit=limit, **filters))
+        next_after = feed_cursor(items[-1]) if len(items) == limit else None
+        return items, next_after
+
+    def vocabulary_counts(self):
+        """Word frequencies straight from the FTS5 vocabulary (fts5vocab), no text scan needed.
+
+        Each distinct text is counted once, even if several records share it.
+        """
+        if not self.fts_enabled:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT term, cnt FROM content_fts_vocab")
+            return {term: count for term, count in cursor.fetchall()}
+
+    def load_expiration_index(self, as_of=None):
+        """Builds an in-memory ExpirationIndex of the ads active on `as_of`."""
+        return ExpirationIndex(
+            (expiration_date, (content, expiration_date))
+            for content, expiration_date in self.get_active_ads(as_of)
+        )
 
 class Content:
-    def __init__(self, text):
+    def __init__(self, text, clock=None):
         self.text = text
-        self.timestamp = datetime.now()
+        self.clock = clock or SYSTEM_CLOCK
+        self.timestamp = self.clock.now()
 
     def format_content(self):
         raise NotImplementedError("Subclasses must implement format_content")
@@ -126,8 +491,8 @@ class Content:
         raise NotImplementedError("Subclasses must implement save_to_db")
 
 class NewsContent(Content):
-    def __init__(self, text, city):
-        super().__init__(text)
+    def __init__(self, text, city, clock=None):
+        super().__init__(text, clock)
         self.city = city
 
     def format_content(self):
@@ -154,15 +519,15 @@ class NewsContent(Content):
         return news
     
     def save_to_db(self, db_manager):
-        return db_manager.save_news(self.text, self.city)
+        return db_manager.save_news(self.text, self.city, self.timestamp)
 
 class AdContent(Content):
-    def __init__(self, text, expiration_date):
-        super().__init__(text)
+    def __init__(self, text, expiration_date, clock=None):
+        super().__init__(text, clock)
         self.expiration_date = datetime.strptime(expiration_date, "%d-%m-%Y")
 
     def days_left(self):
-        delta = self.expiration_date - datetime.now()
+        delta = self.expiration_date - self.clock.now()
         return max(delta.days, 0)
 
     def format_content(self):
@@ -189,11 +554,11 @@ class AdContent(Content):
         return ad
     
     def save_to_db(self, db_manager):
-        return db_manager.save_ad(self.text, self.expiration_date.strftime('%d-%m-%Y'))
+        return db_manager.save_ad(self.text, self.expiration_date.strftime('%d-%m-%Y'), self.timestamp)
 
 class JokeContent(Content):
-    def __init__(self, text, funny_rating):
-        super().__init__(text)
+    def __init__(self, text, funny_rating, clock=None):
+        super().__init__(text, clock)
         self.funny_rating = min(max(1, int(funny_rating)), 10)
 
     def format_content(self):
@@ -220,7 +585,7 @@ class JokeContent(Content):
         return joke
     
     def save_to_db(self, db_manager):
-        return db_manager.save_joke(self.text, str(self.funny_rating))
+        return db_manager.save_joke(self.text, int(self.funny_rating), self.timestamp)
     
     def _number_to_word(self, num):
         numbers = ['zero', 'one', 'two', 'three', 'four', 'five', 
@@ -228,8 +593,23 @@ class JokeContent(Content):
         return numbers[num]
 
 class ContentManager:
-    def __init__(self):
-        self.db_manager = DBManager()
+    def __init__(self, clock=None, storage_dir=None):
+        """`storage_dir` holds the content_storage.* stores and generated_content.txt (this module's directory by default)."""
+        self.storage_dir = storage_dir or os.path.dirname(os.path.abspath(__file__))
+        self.db_manager = DBManager(os.path.join(self.storage_dir, "content_storage.db"))
+        self.clock = clock or SYSTEM_CLOCK
+        self.stats = IncrementalStats(
+            os.path.join(self.storage_dir, "content_storage.txt"),
+            os.path.join(self.storage_dir, "stats_state.json"),
+            os.path.join(self.storage_dir, "csv_words.csv"),
+            os.path.join(self.storage_dir, "csv_counts.csv"),
+        )
+        self.analytics = DBAnalytics(self.db_manager)
+        self.stats_worker = StatsWorker(self.update_statistics)
+
+    def update_statistics(self):
+        self.stats.update()
+        self.analytics.update()
 
     def user_choice(self):
         while True:
@@ -238,14 +618,16 @@ class ContentManager:
             print("2 - Ad")
             print("3 - Joke")
             print("4 - Process file")
-            print("5 - Exit")
+            print("5 - Search")
+            print("6 - Show feed")
+            print("7 - Exit")
             try:
                 choice = int(input(">"))
-                if 1 <= choice <= 5:
+                if 1 <= choice <= 7:
                     return choice
-                print("Please, choose a valid option (1-5).")
+                print("Please, choose a valid option (1-7).")
             except ValueError:
-                print("Please enter a number (1-5).")
+                print("Please enter a number (1-7).")
 
     def content_input(self):
         print("Enter the content (For quit type 'quit'):")
@@ -278,22 +660,22 @@ class ContentManager:
         additional = self.additional_info(choice)
         match choice:
             case 1:
-                return NewsContent(text, additional)
+                return NewsContent(text, additional, self.clock)
             case 2:
-                return AdContent(text, additional)
+                return AdContent(text, additional, self.clock)
             case 3:
-                return JokeContent(text, additional)
+                return JokeContent(text, additional, self.clock)
 
     def save_content(self, content):
         # Save to text file
-        txt_filename = os.path.join(os.path.dirname(__file__), "content_storage.txt")
+        txt_filename = os.path.join(self.storage_dir, "content_storage.txt")
         with open(txt_filename, "a", encoding="utf-8") as file:
             if file.tell() == 0:
                 file.write("News feed:\n")
             file.write(content.format_content())
         
         # Save to JSON file
-        json_filename = os.path.join(os.path.dirname(__file__), "content_storage.json")
+        json_filename = os.path.join(self.storage_dir, "content_storage.json")
         try:
             with open(json_filename, "r", encoding="utf-8") as file:
                 data = json.load(file)
@@ -304,7 +686,7 @@ class ContentManager:
             json.dump(data, file, indent=2, ensure_ascii=False)
 
         # Save to XML file
-        xml_filename = os.path.join(os.path.dirname(__file__), "content_storage.xml")
+        xml_filename = os.path.join(self.storage_dir, "content_storage.xml")
         try:
             tree = ET.parse(xml_filename)
             root = tree.getroot()
@@ -322,14 +704,16 @@ class ContentManager:
         try:
             records = []
             current_record = []
+            # Усі записи одного файлу отримують один спільний час створення
+            batch_clock = CachedClock(self.clock)
             
-            filename = os.path.join(os.path.dirname(__file__), "generated_content.txt")
+            filename = os.path.join(self.storage_dir, "generated_content.txt")
             with open(filename, 'r', encoding='utf-8') as file:
                 for line in file:
                     line = line.strip()
                     if line == "---":
                         if current_record:
-                            record = self.parse_record(current_record)
+                            record = self.parse_record(current_record, batch_clock)
                             if record:
                                 records.append(record)
                             current_record = []
@@ -337,7 +721,7 @@ class ContentManager:
                         current_record.append(line)
                 
                 if current_record:
-                    record = self.parse_record(current_record)
+                    record = self.parse_record(current_record, batch_clock)
                     if record:
                         records.append(record)
             
@@ -347,9 +731,10 @@ class ContentManager:
             print(f"Error reading file: {str(e)}")
             return []
 
-    def parse_record(self, lines):
+    def parse_record(self, lines, clock=None):
         if not lines:
             return None
+        clock = clock or self.clock
             
         record_type = lines[0].strip().lower()
         content = lines[1].strip() if len(lines) > 1 else ""
@@ -357,29 +742,61 @@ class ContentManager:
         
         match record_type:
             case "news":
-                return NewsContent(content, additional_info)
+                return NewsContent(content, additional_info, clock)
             case "ad" | "ads":
-                return AdContent(content, additional_info)
+                return AdContent(content, additional_info, clock)
             case "joke":
-                return JokeContent(content, additional_info)
+                return JokeContent(content, additional_info, clock)
             case _:
                 raise ValueError(f"Unknown record type: {record_type}")
 
+    def search_content(self):
+        query = input("Enter words to search: ")
+        results = self.db_manager.search(query)
+        if not results:
+            print("Nothing found.")
+            return
+        for record_type, content, additional in results:
+            print(f"[{record_type}] {content} ({additional})")
+
+    def show_feed(self, page_size=10):
+        after = None
+        while True:
+            items, after = self.db_manager.get_feed_page(page_size, after)
+            for item in items:
+                print(f"{item.created_at or '-'} [{item.type}] {item.content} ({item.additional})")
+            if after is None:
+                print("End of feed.")
+                return
+            if input("Enter - next page, q - back: ").strip().lower() == "q":
+                return
+
     def run(self):
+        self.stats_worker.start()
+        try:
+            self.menu_loop()
+        finally:
+            # Дописуємо статистику для останніх збережень перед виходом
+            self.stats_worker.stop()
+
+    def menu_loop(self):
         while True:
             choice = self.user_choice()
-            if choice == 5:
+            if choice == 7:
                 print("Exiting program.")
                 break
-            
-            if choice == 4:
+
+            if choice == 6:
+                self.show_feed()
+            elif choice == 5:
+                self.search_content()
+            elif choice == 4:
                 try:
                     records = self.process_file()
                     for record in records:
                         self.save_content(record)
                     print(f"Processed {len(records)} records successfully.")
-                    generate_words_csv()
-                    generate_letters_csv()
+                    self.stats_worker.notify()
                 except Exception as e:
                     print(f"Error processing file: {str(e)}")
             else:
@@ -387,8 +804,7 @@ class ContentManager:
                 try:
                     self.save_content(content)
                     print("Content saved successfully.")
-                    generate_words_csv()
-                    generate_letters_csv()
+                    self.stats_worker.notify()
                 except Exception as e:
                     print(f"Error saving content: {str(e)}")
 
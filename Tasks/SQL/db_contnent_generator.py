@@ -16,13 +16,16 @@ from faker import Faker
 import random
 from pathlib import Path
 import os
-import pyodbc
 import hashlib
+from db_backend import get_backend
+from functools import partial
+from parallel_generation import iter_records
+from value_pools import FakerValues, ValuePools
 
 # Створюємо екземпляр Faker з українською локалізацією
 fake = Faker('uk_UA')
-# Додаємо англійську локалізацію для деяких даних
-fake_en = Faker('en_US')
+# Джерело міст, компаній, дат і текстів (див. use_value_pools)
+values = FakerValues(fake)
 
 # Список жартів та шаблони реклами залишаються без змін...
 JOKES = [
@@ -85,18 +88,33 @@ def create_tables(conn):
     conn.commit()
     print("Tables created successfully")
 
+PRODUCTS = ['смартфони', 'ноутбуки', 'планшети', 'телевізори',
+            'навушники', 'книги', 'меблі', 'одяг', 'взуття',
+            'косметика', 'побутова техніка']
+
+SEASONS = ['весна', 'літо', 'осінь', 'зима']
+
+def use_value_pools(enabled=True, base_date=None, **options):
+    """Switch generate_record between Faker calls and pre-sampled value pools (see value_pools.py)"""
+    global values
+    values = ValuePools('uk_UA', base_date=base_date, **options) if enabled else FakerValues(fake, base_date=base_date)
+
 def generate_ad():
-    template = random.choice(AD_TEMPLATES)
+    template = values.choice(AD_TEMPLATES)
     return template.format(
-        product=random.choice(['смартфони', 'ноутбуки', 'планшети', 'телевізори', 
-                             'навушники', 'книги', 'меблі', 'одяг', 'взуття', 
-                             'косметика', 'побутова техніка']),
+        product=values.choice(PRODUCTS),
         discount=random.randint(10, 90),
-        date=fake.date_between(start_date='today', end_date='+30d').strftime('%d.%m.%Y'),
-        brand=fake.company(),
-        season=random.choice(['весна', 'літо', 'осінь', 'зима'])
+        date=values.date().strftime('%d.%m.%Y'),
+        brand=values.company(),
+        season=values.choice(SEASONS)
     )
 
+def seed_generator(seed):
+    """Seed random and Faker, parallel_generation calls it for every chunk"""
+    random.seed(seed)
+    fake.seed_instance(seed)
+    values.reset()
+
 def get_content_hash(content):
     """Generate a more reliable hash using SHA-256"""
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -106,24 +124,22 @@ def generate_record():
     record_type = random.choice(["news", "ads", "joke"])
     
     if record_type == "news":
-        content = fake.text(max_nb_chars=200)
-        additional = fake.city()
+        content = values.text(max_nb_chars=200)
+        additional = values.city()
     elif record_type == "ads":
         content = generate_ad()
-        additional = fake.date_between(start_date='today', end_date='+30d').strftime('%d-%m-%Y')
+        additional = values.date().strftime('%d-%m-%Y')
     else:  # joke
-        content = random.choice(JOKES)
+        content = values.choice(JOKES)
         additional = str(random.randint(1, 10))
     
     return [record_type, content, additional]
 
-def append_to_file(filename, record):
-    """Append a single record to the file"""
-    with open(filename, 'a', encoding='utf-8') as file:
-        # Якщо файл не пустий, додаємо роздільник
-        if os.path.getsize(filename) > 0:
-            file.write("\n---\n")
-        file.write(f"{record[0]}\n{record[1]}\n{record[2]}")
+def write_record(file, record, first):
+    """Write a single record to an open file, separators go between records"""
+    if not first:
+        file.write("\n---\n")
+    file.write(f"{record[0]}\n{record[1]}\n{record[2]}")
 
 def create_or_clear_file(filename):
     """Create a new file or clear existing one"""
@@ -131,8 +147,26 @@ def create_or_clear_file(filename):
         pass
     print(f"File created/cleared: {filename}")
 
-def generate_content(num_records=10):
-    """Generate content and save it to both DB and file"""
+INSERT_QUERIES = {
+    "news": "INSERT OR IGNORE INTO news (content, city, content_hash) VALUES (?, ?, ?);",
+    "ads": "INSERT OR IGNORE INTO ads (content, expiration_date, content_hash) VALUES (?, ?, ?);",
+    "joke": "INSERT OR IGNORE INTO joke (content, funny_rating, content_hash) VALUES (?, ?, ?);",
+}
+
+def generate_content(num_records=10, backend=None, batch_size=1000, max_attempts=None, workers=1, seed=None,
+                     value_pools=False):
+    """Generate content and save it to both DB and file
+
+    Records are inserted in transactions of `batch_size` records. A record is
+    written to the file only after its transaction is committed. Generation
+    stops after `max_attempts` records (3 * num_records by default): jokes and
+    some ad templates repeat, so large runs skip many duplicates.
+
+    With `workers` > 1 (None for all CPUs) records are generated in a process
+    pool, see parallel_generation.py; `seed` makes the run reproducible.
+    Uniqueness is still checked by the content hash in the database.
+    value_pools=True draws values from pre-sampled pools, see use_value_pools.
+    """
     # Отримуємо шлях до поточної директорії
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -143,62 +177,60 @@ def generate_content(num_records=10):
     # Створюємо/очищуємо файл
     create_or_clear_file(file_path)
     
-    # Підключаємося до бази даних
-    connection_string = f'DRIVER={{SQLite3 ODBC Driver}};Direct=True;Database={db_path};String Types=Unicode'
+    # Підключаємося до бази даних (sqlite3 або pyodbc, див. db_backend.py)
+    db_backend = get_backend(db_path, backend)
     
-    with pyodbc.connect(connection_string) as conn:
+    with db_backend.connect() as conn, open(file_path, 'a', encoding='utf-8') as file:
         # Створюємо таблиці
         create_tables(conn)
         cursor = conn.cursor()
         
         successful_inserts = 0
-        attempts = 0
-        max_attempts = num_records * 2
-
-        while successful_inserts < num_records and attempts < max_attempts:
-            record = generate_record()
+        duplicates = 0
+        max_attempts = max_attempts or num_records * 3
+        batch = []
+        # Джерело значень задається в цьому процесі та в кожному робочому процесі
+        records = iter_records(generate_record, seed_generator, max_attempts, workers, seed,
+                               setup=partial(use_value_pools, value_pools))
+
+        for record in records:
             content_hash = get_content_hash(record[1])
             
             try:
-                if record[0] == "news":
-                    insert_query = """
-                        INSERT INTO news (content, city, content_hash)        
-                        VALUES (?, ?, ?);
-                        """
-                elif record[0] == "ads":
-                    insert_query = """
-                        INSERT INTO ads (content, expiration_date, content_hash)        
-                        VALUES (?, ?, ?);
-                        """
-                else:  # joke
-                    insert_query = """
-                        INSERT INTO joke (content, funny_rating, content_hash)        
-                        VALUES (?, ?, ?);
-                        """
-                
-                # Спроба вставки в БД
-                cursor.execute(insert_query, (record[1], record[2], content_hash))
-                cursor.commit()
-                
-                # Якщо вставка в БД успішна, додаємо запис у файл
-                append_to_file(file_path, record)
-                
-                successful_inserts += 1
-                print(f"Successfully inserted record {successful_inserts}/{num_records} of type {record[0]}")
-                
-            except pyodbc.Error as e:
-                if 'UNIQUE constraint failed' in str(e):
-                    print(f"Duplicate content hash encountered for {record[0]}, trying again...")
-                else:
-                    print(f"Database error: {str(e)}")
-                    raise
-            
-            attempts += 1
+                # INSERT OR IGNORE: дублікат не перериває транзакцію, rowcount = 0
+                cursor.execute(INSERT_QUERIES[record[0]], (record[1], record[2], content_hash))
+            except db_backend.Error as e:
+                print(f"Database error: {str(e)}")
+                raise
+            if cursor.rowcount == 0:
+                duplicates += 1
+                continue
+            batch.append(record)
+
+            if len(batch) >= batch_size:
+                successful_inserts += flush_batch(conn, file, batch, successful_inserts)
+                batch = []
+                print(f"Inserted {successful_inserts}/{num_records} records ({duplicates} duplicates skipped)")
+            if successful_inserts + len(batch) >= num_records:
+                break
+
+        records.close()
+        if batch:
+            successful_inserts += flush_batch(conn, file, batch, successful_inserts)
         
+        if duplicates:
+            print(f"Skipped {duplicates} records with duplicate content hash")
         if successful_inserts < num_records:
             print(f"Warning: Only managed to insert {successful_inserts} unique records out of {num_records} requested")
         else:
             print(f"Successfully inserted all {num_records} records")
 
+def flush_batch(conn, file, batch, written):
+    """Commit the batch and append its records to the file, returns the number of records"""
+    conn.commit()
+    for number, record in enumerate(batch):
+        write_record(file, record, written + number == 0)
+    return len(batch)
+
 if __name__ == "__main__":
     generate_content(100)
\ No newline at end of file
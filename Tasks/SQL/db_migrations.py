@@ -0,0 +1,363 @@
+"""
+Schema migrations for the content database.
+
+The schema version is kept in `PRAGMA user_version`. A new database gets the
+latest schema at once; an existing one is moved forward by running every
+migration newer than its version, in order:
+
+1. content_blobs  - texts move from the news/ads/joke tables into content_blobs
+2. ads_expires_on - sortable ISO `expires_on` (YYYY-MM-DD) next to DD-MM-YYYY
+3. created_at     - creation time column on every content table
+4. joke_rating    - `funny_rating` becomes an INTEGER between 1 and 10
+5. indexes        - indexes for time-range and rating queries
+6. news_city      - (city, created_at) index for the per-city feed
+7. near_dupes     - MinHash signatures, LSH buckets and flagged near-duplicates
+
+Row copies and backfills run in batches of `batch_size` rows, each in its own
+transaction together with its progress record in `schema_migrations`. If a
+migration is interrupted, the next run continues after the last committed
+batch instead of starting over. Every migration also checks the actual table
+layout, so databases upgraded by older versions of DBManager are handled too.
+
+Works with any DB-API connection to SQLite (pyodbc or sqlite3).
+"""
+
+import argparse
+import os
+import sqlite3
+
+DEFAULT_BATCH_SIZE = 10000
+
+CONTENT_BLOBS_SQL = """
+CREATE TABLE IF NOT EXISTS content_blobs (
+    content_hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+"""
+
+# Остаточна схема таблиць типів контенту ({name} - ім'я таблиці, що створюється)
+TABLE_SQL = {
+    "news": """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        city TEXT NOT NULL,
+        content_hash TEXT NOT NULL UNIQUE REFERENCES content_blobs (content_hash),
+        created_at TEXT
+    );
+    """,
+    "ads": """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        expiration_date TEXT NOT NULL,
+        content_hash TEXT NOT NULL UNIQUE REFERENCES content_blobs (content_hash),
+        expires_on TEXT,
+        created_at TEXT
+    );
+    """,
+    "joke": """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        funny_rating INTEGER NOT NULL CHECK (funny_rating BETWEEN 1 AND 10),
+        content_hash TEXT NOT NULL UNIQUE REFERENCES content_blobs (content_hash),
+        created_at TEXT
+    );
+    """,
+}
+
+# Схема jokes до міграції 4: рейтинг ще текстовий і без обмежень, його перетворює joke_rating
+LEGACY_TABLE_SQL = {
+    "joke": """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        funny_rating TEXT NOT NULL,
+        content_hash TEXT NOT NULL UNIQUE REFERENCES content_blobs (content_hash),
+        created_at TEXT
+    );
+    """,
+}
+
+INDEX_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_ads_expires_on ON ads (expires_on)",
+    "CREATE INDEX IF NOT EXISTS idx_news_created_at ON news (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ads_created_at ON ads (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_joke_created_at ON joke (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_joke_funny_rating ON joke (funny_rating)",
+]
+
+# Стрічка новин міста, найновіші першими
+NEWS_CITY_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_news_city_created_at ON news (city, created_at)"
+
+# Індекс майже дублікатів (див. near_duplicates.py), записи зникають разом з текстом
+NEAR_DUPLICATES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS minhash_signatures (
+        content_hash TEXT PRIMARY KEY REFERENCES content_blobs (content_hash) ON DELETE CASCADE,
+        signature BLOB NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        content_hash TEXT NOT NULL REFERENCES minhash_signatures (content_hash) ON DELETE CASCADE,
+        PRIMARY KEY (band, bucket, content_hash)
+    ) WITHOUT ROWID;
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_lsh_buckets_content_hash ON lsh_buckets (content_hash)",
+    """
+    CREATE TABLE IF NOT EXISTS near_duplicates (
+        content_hash TEXT PRIMARY KEY REFERENCES content_blobs (content_hash) ON DELETE CASCADE,
+        similar_to TEXT NOT NULL,
+        similarity REAL NOT NULL
+    );
+    """,
+]
+
+# DD-MM-YYYY -> YYYY-MM-DD, щоб дати можна було порівнювати як рядки
+ISO_EXPIRATION_SQL = (
+    "substr(expiration_date, 7, 4) || '-' || substr(expiration_date, 4, 2) || '-' || substr(expiration_date, 1, 2)"
+)
+
+
+def table_columns(cursor, table):
+    """Column name -> declared type of a table (empty when the table does not exist)."""
+    return {row[1]: (row[2] or "").upper() for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def get_version(cursor):
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_version(cursor, version):
+    cursor.execute(f"PRAGMA user_version = {int(version)}")
+
+
+class Progress:
+    """Last processed id of a migration step, stored in schema_migrations."""
+
+    def __init__(self, cursor, version, step):
+        self.cursor = cursor
+        self.version = version
+        self.step = step
+
+    def get(self):
+        row = self.cursor.execute(
+            "SELECT last_id FROM schema_migrations WHERE version = ? AND step = ?",
+            (self.version, self.step)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def set(self, last_id):
+        self.cursor.execute(
+            """
+            INSERT INTO schema_migrations (version, step, last_id) VALUES (?, ?, ?)
+            ON CONFLICT (version, step) DO UPDATE SET last_id = excluded.last_id
+            """,
+            (self.version, self.step, last_id)
+        )
+
+
+def iter_id_batches(conn, table, progress, batch_size):
+    """Yields (after_id, up_to_id) ranges of existing ids, starting after the saved progress.
+
+    The caller processes a range and commits; progress is saved here in the same
+    transaction before the commit.
+    """
+    cursor = conn.cursor()
+    while True:
+        last_id = progress.get()
+        row = cursor.execute(
+            f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+            (last_id, batch_size)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return
+        yield last_id, row[0]
+        progress.set(row[0])
+        conn.commit()
+
+
+def rebuild_table(conn, table, columns, select_exprs, version, batch_size, before_batch=None,
+                  table_sql=None, log=print):
+    """Copies `table` into a table with the latest schema batch by batch and swaps them.
+
+    `select_exprs` are the source expressions for `columns`. `before_batch(cursor, after_id,
+    up_to_id)` runs inside every batch transaction before the rows are copied. `table_sql`
+    replaces the latest schema when an earlier migration must not apply later constraints yet.
+    """
+    cursor = conn.cursor()
+    new_table = f"{table}_new"
+    cursor.execute((table_sql or TABLE_SQL[table]).format(name=new_table))
+    conn.commit()
+
+    progress = Progress(cursor, version, f"rebuild_{table}")
+    for after_id, up_to_id in iter_id_batches(conn, table, progress, batch_size):
+        if before_batch:
+            before_batch(cursor, after_id, up_to_id)
+        cursor.execute(
+            f"INSERT INTO {new_table} ({', '.join(columns)}) "
+            f"SELECT {', '.join(select_exprs)} FROM {table} WHERE id > ? AND id <= ?",
+            (after_id, up_to_id)
+        )
+        log(f"  {table}: copied rows up to id {up_to_id}")
+
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    conn.commit()
+
+
+def migrate_content_blobs(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    cursor.execute(CONTENT_BLOBS_SQL)
+    conn.commit()
+    for table, column in (("news", "city"), ("ads", "expiration_date"), ("joke", "funny_rating")):
+        if "content" not in table_columns(cursor, table):
+            continue
+
+        def copy_blobs(batch_cursor, after_id, up_to_id, table=table):
+            batch_cursor.execute(
+                f"INSERT OR IGNORE INTO content_blobs (content_hash, content) "
+                f"SELECT content_hash, content FROM {table} WHERE id > ? AND id <= ?",
+                (after_id, up_to_id)
+            )
+
+        log(f"Moving {table}.content into content_blobs")
+        rebuild_table(
+            conn, table, ["id", column, "content_hash"], ["id", column, "content_hash"],
+            version, batch_size, before_batch=copy_blobs, table_sql=LEGACY_TABLE_SQL.get(table), log=log
+        )
+
+
+def migrate_ads_expires_on(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    if "expires_on" not in table_columns(cursor, "ads"):
+        cursor.execute("ALTER TABLE ads ADD COLUMN expires_on TEXT")
+        conn.commit()
+    progress = Progress(cursor, version, "backfill_expires_on")
+    for after_id, up_to_id in iter_id_batches(conn, "ads", progress, batch_size):
+        cursor.execute(
+            f"UPDATE ads SET expires_on = {ISO_EXPIRATION_SQL} "
+            f"WHERE id > ? AND id <= ? AND expires_on IS NULL",
+            (after_id, up_to_id)
+        )
+        log(f"  ads: expires_on filled up to id {up_to_id}")
+
+
+def migrate_created_at(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    for table in TABLE_SQL:
+        if "created_at" not in table_columns(cursor, table):
+            # Час створення старих записів невідомий, тому для них залишається NULL
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN created_at TEXT")
+    conn.commit()
+
+
+def migrate_joke_rating(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    if table_columns(cursor, "joke").get("funny_rating") == "INTEGER":
+        return
+    log("Converting joke.funny_rating to INTEGER")
+    rebuild_table(
+        conn, "joke",
+        ["id", "funny_rating", "content_hash", "created_at"],
+        ["id", "MIN(MAX(CAST(funny_rating AS INTEGER), 1), 10)", "content_hash", "created_at"],
+        version, batch_size, log=log
+    )
+
+
+def migrate_indexes(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    for sql in INDEX_SQL:
+        cursor.execute(sql)
+    conn.commit()
+
+
+def migrate_news_city(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    cursor.execute(NEWS_CITY_INDEX_SQL)
+    conn.commit()
+
+
+def migrate_near_duplicates(conn, version, batch_size, log):
+    cursor = conn.cursor()
+    for sql in NEAR_DUPLICATES_SQL:
+        cursor.execute(sql)
+    conn.commit()
+
+
+MIGRATIONS = [
+    (1, "content_blobs", migrate_content_blobs),
+    (2, "ads_expires_on", migrate_ads_expires_on),
+    (3, "created_at", migrate_created_at),
+    (4, "joke_rating", migrate_joke_rating),
+    (5, "indexes", migrate_indexes),
+    (6, "news_city", migrate_news_city),
+    (7, "near_duplicates", migrate_near_duplicates),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def create_schema(conn):
+    """Creates the latest schema in an empty database."""
+    cursor = conn.cursor()
+    cursor.execute(CONTENT_BLOBS_SQL)
+    for table, sql in TABLE_SQL.items():
+        cursor.execute(sql.format(name=table))
+    for sql in INDEX_SQL:
+        cursor.execute(sql)
+    cursor.execute(NEWS_CITY_INDEX_SQL)
+    for sql in NEAR_DUPLICATES_SQL:
+        cursor.execute(sql)
+    set_version(cursor, LATEST_VERSION)
+    conn.commit()
+
+
+def migrate(conn, batch_size=DEFAULT_BATCH_SIZE, log=print):
+    """Brings the database to the latest schema version. Returns the list of applied migrations."""
+    cursor = conn.cursor()
+    # Діє лише для нової бази; існуючу переводить retention.vacuum() повним VACUUM
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER NOT NULL,
+        step TEXT NOT NULL,
+        last_id INTEGER NOT NULL,
+        PRIMARY KEY (version, step)
+    );
+    """)
+    conn.commit()
+
+    for table in TABLE_SQL:
+        # Перервана заміна таблиці: стару вже видалено, нову ще не перейменовано
+        if not table_columns(cursor, table) and table_columns(cursor, f"{table}_new"):
+            cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    conn.commit()
+
+    if not table_columns(cursor, "news") and not table_columns(cursor, "ads") and not table_columns(cursor, "joke"):
+        create_schema(conn)
+        return []
+
+    applied = []
+    for version, name, migration in MIGRATIONS:
+        if get_version(cursor) >= version:
+            continue
+        log(f"Applying migration {version}: {name}")
+        migration(conn, version, batch_size, log)
+        cursor.execute("DELETE FROM schema_migrations WHERE version = ?", (version,))
+        set_version(cursor, version)
+        conn.commit()
+        applied.append(name)
+    return applied
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Migrate a content database to the latest schema")
+    parser.add_argument("db_path", nargs="?", default=os.path.join(current_dir, "content_storage.db"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with sqlite3.connect(args.db_path) as connection:
+        applied = migrate(connection, args.batch_size)
+    print(f"Applied migrations: {', '.join(applied) or 'none'} (schema version {LATEST_VERSION})")
@@ -0,0 +1,152 @@
+"""
+Optional single-table storage for news, ads and jokes.
+
+convert_to_unified() moves the rows of the news, ads and joke tables into one
+`content` table with a `type` column ('news', 'ad', 'joke') and the
+type-specific columns side by side (NULL for other types). The old tables are
+replaced by views with the same names and columns, and INSTEAD OF triggers
+send inserts and deletes on the views to `content`, so DBManager, DBAnalytics
+and older scripts keep working unchanged.
+
+Indexes:
+    idx_content_feed          (created_at, type)  - merged feed, newest first
+    idx_content_news_*        partial, WHERE type = 'news'
+    idx_content_ads_*         partial, WHERE type = 'ad'
+    idx_content_joke_*        partial, WHERE type = 'joke'
+
+Rows are copied in batches with their progress in schema_migrations, so an
+interrupted conversion continues where it stopped. The database is first
+migrated to the latest schema (see db_migrations.py). Rows get new ids (one
+sequence for all types); the analytics cache is cleared so that DBAnalytics
+recounts it.
+
+Usage: python db_unified.py [db_path] [--batch-size N]
+"""
+
+import argparse
+import os
+import sqlite3
+
+from db_migrations import DEFAULT_BATCH_SIZE, Progress, iter_id_batches, migrate
+
+# Тип запису -> стара таблиця та її колонки, крім id
+TYPE_TABLES = {
+    "news": ("news", ["city", "content_hash", "created_at"]),
+    "ad": ("ads", ["expiration_date", "content_hash", "expires_on", "created_at"]),
+    "joke": ("joke", ["funny_rating", "content_hash", "created_at"]),
+}
+
+# Кроки перетворення не мають номера версії схеми, тому їх прогрес зберігається під версією 0
+CONVERSION_VERSION = 0
+
+CONTENT_SQL = """
+CREATE TABLE IF NOT EXISTS content (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL CHECK (type IN ('news', 'ad', 'joke')),
+    content_hash TEXT NOT NULL REFERENCES content_blobs (content_hash),
+    created_at TEXT,
+    city TEXT,
+    expiration_date TEXT,
+    expires_on TEXT,
+    funny_rating INTEGER,
+    UNIQUE (content_hash, type),
+    CHECK (type <> 'news' OR city IS NOT NULL),
+    CHECK (type <> 'ad' OR expiration_date IS NOT NULL),
+    CHECK (type <> 'joke' OR funny_rating BETWEEN 1 AND 10)
+);
+"""
+
+INDEX_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_content_feed ON content (created_at, type)",
+    "CREATE INDEX IF NOT EXISTS idx_content_news_created_at ON content (created_at) WHERE type = 'news'",
+    "CREATE INDEX IF NOT EXISTS idx_content_news_city ON content (city, created_at) WHERE type = 'news'",
+    "CREATE INDEX IF NOT EXISTS idx_content_ads_created_at ON content (created_at) WHERE type = 'ad'",
+    "CREATE INDEX IF NOT EXISTS idx_content_ads_expires_on ON content (expires_on) WHERE type = 'ad'",
+    "CREATE INDEX IF NOT EXISTS idx_content_joke_created_at ON content (created_at) WHERE type = 'joke'",
+    "CREATE INDEX IF NOT EXISTS idx_content_joke_funny_rating ON content (funny_rating) WHERE type = 'joke'",
+]
+
+ANALYTICS_TABLES = ("analytics_words", "analytics_letters", "analytics_progress")
+
+
+def object_type(cursor, name):
+    """'table', 'view' or None."""
+    row = cursor.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def is_unified(cursor):
+    return object_type(cursor, "content") == "table" and object_type(cursor, "news") == "view"
+
+
+def compatibility_sql(record_type, table, columns):
+    """View with the old table's name and columns plus the triggers that write through it."""
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{column}" for column in columns)
+    return [
+        f"CREATE VIEW IF NOT EXISTS {table} AS "
+        f"SELECT id, {column_list} FROM content WHERE type = '{record_type}'",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_view_insert INSTEAD OF INSERT ON {table} BEGIN
+            INSERT INTO content (type, {column_list}) VALUES ('{record_type}', {new_values});
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_view_delete INSTEAD OF DELETE ON {table} BEGIN
+            DELETE FROM content WHERE id = OLD.id;
+        END;
+        """,
+    ]
+
+
+def convert_to_unified(conn, batch_size=DEFAULT_BATCH_SIZE, log=print):
+    """Moves news, ads and joke into the content table. Returns False if the database already uses it."""
+    cursor = conn.cursor()
+    if is_unified(cursor):
+        return False
+    # Копіювання розраховане на останню схему (content_blobs, created_at, expires_on)
+    migrate(conn, batch_size, log)
+    cursor.execute(CONTENT_SQL)
+    for sql in INDEX_SQL:
+        cursor.execute(sql)
+    conn.commit()
+
+    for record_type, (table, columns) in TYPE_TABLES.items():
+        if object_type(cursor, table) != "table":
+            continue
+        column_list = ", ".join(columns)
+        progress = Progress(cursor, CONVERSION_VERSION, f"unified_{table}")
+        for after_id, up_to_id in iter_id_batches(conn, table, progress, batch_size):
+            cursor.execute(
+                f"INSERT INTO content (type, {column_list}) "
+                f"SELECT '{record_type}', {column_list} FROM {table} WHERE id > ? AND id <= ? ORDER BY id",
+                (after_id, up_to_id)
+            )
+            log(f"  {table}: copied rows up to id {up_to_id}")
+
+    # Старі таблиці замінюються на представлення з тими самими назвами
+    for record_type, (table, columns) in TYPE_TABLES.items():
+        if object_type(cursor, table) == "table":
+            cursor.execute(f"DROP TABLE {table}")
+        for sql in compatibility_sql(record_type, table, columns):
+            cursor.execute(sql)
+    for table in ANALYTICS_TABLES:
+        if object_type(cursor, table) == "table":
+            cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("DELETE FROM schema_migrations WHERE version = ?", (CONVERSION_VERSION,))
+    conn.commit()
+    return True
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Move news, ads and jokes into one content table")
+    parser.add_argument("db_path", nargs="?", default=os.path.join(current_dir, "content_storage.db"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with sqlite3.connect(args.db_path) as connection:
+        if convert_to_unified(connection, args.batch_size):
+            print("The database now stores all content in one table")
+        else:
+            print("The database already uses the content table")
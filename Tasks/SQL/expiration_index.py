@@ -0,0 +1,73 @@
+"""
+In-memory expiration index for ads.
+
+Ads are kept in a list sorted by (expiration date, insertion order). A binary
+search finds the first ad that is still active, so the expired ads are the
+slice before it and the active ones the slice after it: expired(), active()
+and purge() take O(log n + k) for k returned ads and return them in expiration
+order, instead of checking every ad. Adding an ad is a binary search plus a
+list insert.
+"""
+
+from datetime import date, datetime
+import bisect
+import itertools
+
+
+def to_date(value):
+    """Accepts a date, a datetime, an ISO 'YYYY-MM-DD' or a 'DD-MM-YYYY' string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value is None:
+        return date.today()
+    for date_format in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported date format: {value}")
+
+
+class ExpirationIndex:
+    """(expiration date, item) pairs sorted by date, with binary search for the expired/active boundary."""
+
+    def __init__(self, items=()):
+        self._counter = itertools.count()
+        self._entries = sorted((to_date(expires_on), next(self._counter), item) for expires_on, item in items)
+        # Записи перед _start уже видалені purge(); список стискається, коли їх більше половини
+        self._start = 0
+
+    def __len__(self):
+        return len(self._entries) - self._start
+
+    def _boundary(self, as_of):
+        """Position of the first entry still active on `as_of`."""
+        # (дата,) менше за будь-який запис (дата, номер, елемент) з тією ж датою
+        return bisect.bisect_left(self._entries, (to_date(as_of),), self._start)
+
+    def add(self, expires_on, item):
+        bisect.insort(self._entries, (to_date(expires_on), next(self._counter), item), self._start)
+
+    def next_expiration(self):
+        """Date when the next ad expires, or None when the index is empty."""
+        return self._entries[self._start][0] if len(self) else None
+
+    def expired(self, as_of=None):
+        """Items that expired before `as_of`, earliest first, without removing them."""
+        return [item for _, _, item in self._entries[self._start:self._boundary(as_of)]]
+
+    def active(self, as_of=None):
+        """Items still valid on `as_of` (the expiration day itself counts as active), earliest first."""
+        return [item for _, _, item in self._entries[self._boundary(as_of):]]
+
+    def purge(self, as_of=None):
+        """Removes and returns items that expired before `as_of`, earliest first."""
+        end = self._boundary(as_of)
+        purged = [item for _, _, item in self._entries[self._start:end]]
+        self._start = end
+        if self._start * 2 > len(self._entries):
+            del self._entries[:self._start]
+            self._start = 0
+        return purged
@@ -0,0 +1,44 @@
+"""
+Misra-Gries heavy-hitters summary for bounded-memory word statistics.
+
+The summary keeps at most `capacity` counters no matter how many distinct
+words the stream has. Every word that occurs more than N / (capacity + 1)
+times among N words is guaranteed to be kept, and each kept count
+underestimates the true count by at most `error_bound`.
+
+Counts are merged a chunk at a time (Misra-Gries summaries are mergeable):
+the chunk's Counter is added to the summary, and if that leaves more than
+`capacity` words, the (capacity + 1)-th largest count is subtracted from all
+of them and the words that drop to zero are removed.
+"""
+
+import heapq
+
+
+class MisraGries:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counters = {}
+        self.total = 0
+        self.error_bound = 0
+
+    def update(self, counts):
+        """Merges a mapping of word -> count into the summary."""
+        counters = self.counters
+        for word, count in counts.items():
+            counters[word] = counters.get(word, 0) + count
+            self.total += count
+        if len(counters) > self.capacity:
+            cut = heapq.nlargest(self.capacity + 1, counters.values())[-1]
+            self.counters = {word: count - cut for word, count in counters.items() if count > cut}
+            self.error_bound += cut
+
+    def top(self, k):
+        """Top-k words as (word, estimated count, max error), most frequent first.
+
+        The true count lies between the estimate and estimate + max error.
+        """
+        best = heapq.nlargest(k, self.counters.items(), key=lambda item: (item[1], item[0]))
+        return [(word, count, self.error_bound) for word, count in best]
@@ -0,0 +1,151 @@
+"""
+Incremental word and letter statistics for content_storage.txt.
+
+The store is append-only, so instead of re-reading it after every save we keep
+the word and letter counters in a state file together with a high-water-mark
+byte offset. Each update streams only the bytes appended since the last offset
+(in chunks of STREAM_CHUNK_SIZE), folds them into the counters and rewrites
+csv_words.csv / csv_counts.csv from the maintained state.
+
+The state also records the inode of the store and a fingerprint of the bytes
+already counted (the first and the last FINGERPRINT_SIZE bytes before the
+offset). If the store was replaced or rewritten, not just appended to, the
+counters are rebuilt from scratch.
+"""
+
+from collections import Counter
+import hashlib
+import json
+import os
+
+from csv_word_count_v2 import content_file, csv_words, csv_counter, STREAM_CHUNK_SIZE
+from csv_word_count_v2 import iter_text_chunks, iter_chunk_words, count_letters_python
+from csv_word_count_v2 import letter_stats_from_counts, write_words_csv, write_letters_csv
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+state_file = os.path.join(current_dir, "stats_state.json")
+
+FINGERPRINT_SIZE = 4096
+
+
+def fingerprint(filename, offset):
+    """SHA-256 of the first and the last FINGERPRINT_SIZE bytes of filename[:offset]."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        digest.update(file.read(min(offset, FINGERPRINT_SIZE)))
+        tail = max(offset - FINGERPRINT_SIZE, 0)
+        file.seek(tail)
+        digest.update(file.read(offset - tail))
+    return digest.hexdigest()
+
+
+def last_line_end(filename, start, end, chunk_size=STREAM_CHUNK_SIZE):
+    """Offset right after the last newline in filename[start:end], or `start` if there is none."""
+    with open(filename, "rb") as file:
+        while end > start:
+            block_start = max(end - chunk_size, start)
+            file.seek(block_start)
+            position = file.read(end - block_start).rfind(b"\n")
+            if position >= 0:
+                return block_start + position + 1
+            end = block_start
+    return start
+
+
+class IncrementalStats:
+    def __init__(self, content_file=content_file, state_file=state_file,
+                 words_csv=csv_words, letters_csv=csv_counter, chunk_size=STREAM_CHUNK_SIZE):
+        self.content_file = content_file
+        self.state_file = state_file
+        self.words_csv = words_csv
+        self.letters_csv = letters_csv
+        self.chunk_size = chunk_size
+        self.reset()
+        self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        # Стан старого формату без inode та відбитка не можна перевірити - рахуємо заново
+        if "fingerprint" not in state:
+            return
+        self.offset = state["offset"]
+        self.inode = state["inode"]
+        self.fingerprint = state["fingerprint"]
+        self.words = Counter(state["words"])
+        self.letters = Counter(state["letters"])
+
+    def save_state(self):
+        state = {
+            "offset": self.offset,
+            "inode": self.inode,
+            "fingerprint": self.fingerprint,
+            "words": self.words,
+            "letters": self.letters,
+        }
+        temp_file = self.state_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temp_file, self.state_file)
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.fingerprint = None
+        self.words = Counter()
+        self.letters = Counter()
+
+    def fold(self, chunks):
+        """Adds the words and letters of text chunks to the counters; a word may span two chunks."""
+        def count_letters(chunks):
+            for chunk in chunks:
+                self.letters.update(count_letters_python((chunk,)))
+                yield chunk
+
+        for words in iter_chunk_words(count_letters(chunks)):
+            self.words.update(words)
+
+    def is_same_store(self, stat):
+        """Whether the counted bytes are still the start of the store (it was only appended to)."""
+        if self.offset == 0:
+            return True
+        if stat.st_size < self.offset or stat.st_ino != self.inode:
+            return False
+        return fingerprint(self.content_file, self.offset) == self.fingerprint
+
+    def update(self):
+        """Folds in text appended since the last update and rewrites both CSV files.
+
+        Returns the number of bytes processed.
+        """
+        try:
+            stat = os.stat(self.content_file)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or not self.is_same_store(stat):
+            # Файл перестворили, обрізали або переписали - рахуємо заново
+            self.reset()
+
+        processed = 0
+        if stat is not None and stat.st_size > self.offset:
+            # Беремо тільки завершені рядки, щоб не розрізати слово або UTF-8 символ
+            end = last_line_end(self.content_file, self.offset, stat.st_size, self.chunk_size)
+            if end > self.offset:
+                self.fold(iter_text_chunks(self.content_file, self.offset, end, self.chunk_size))
+                processed = end - self.offset
+                self.offset = end
+                self.inode = stat.st_ino
+                self.fingerprint = fingerprint(self.content_file, end)
+                self.save_state()
+
+        write_words_csv(self.words, self.words_csv)
+        write_letters_csv(letter_stats_from_counts(self.letters), self.letters_csv)
+        return processed
+
+
+if __name__ == "__main__":
+    stats = IncrementalStats()
+    print(f"Processed {stats.update()} new bytes of {stats.content_file}")
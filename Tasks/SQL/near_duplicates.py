@@ -0,0 +1,186 @@
+"""
+Near-duplicate detection with MinHash signatures and an LSH band index.
+
+The exact check in DBManager (SHA-256 of the text) misses texts that differ by
+a word or two. Here every text is turned into a set of character shingles and
+summarized by a MinHash signature: NUM_PERM minimums of random hash functions
+over the shingles. Two signatures agree in a position with probability equal
+to the Jaccard similarity of the shingle sets.
+
+The signature is cut into BANDS bands of ROWS values. Texts that share the
+hash of at least one band are candidates; only they are compared, so a lookup
+costs BANDS index probes instead of a scan over all stored texts. With 16
+bands of 4 rows a pair with similarity 0.7 becomes a candidate with
+probability ~0.99, a pair with 0.3 with ~0.12.
+
+MinHashLSH keeps the index in memory, SQLiteLSHIndex in the content database
+(tables minhash_signatures and lsh_buckets, see db_migrations.py).
+"""
+
+from collections import defaultdict
+import hashlib
+import random
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.7
+
+# Скільки текстів з одного кошика перевіряти: для рішення достатньо одного схожого
+MAX_BUCKET_CANDIDATES = 50
+# SQLiteLSHIndex: скільки кандидатів перевіряти загалом, ті, що мають більше спільних смуг, першими
+MAX_CANDIDATES = MAX_BUCKET_CANDIDATES * BANDS
+
+# Що робити з майже дублікатом: зберегти і позначити або відхилити
+POLICIES = ("flag", "reject")
+
+# a * hash + b < 2**63: ті самі значення дає і Python, і NumPy (uint64)
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class MinHasher:
+    """Computes MinHash signatures of texts (lowercased, whitespace collapsed)."""
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1, use_numpy=None):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        if self.use_numpy:
+            self._a = np.array([a for a, _ in self.permutations], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self.permutations], dtype=np.uint64)[:, None]
+
+    def shingles(self, text):
+        text = " ".join(text.lower().split())
+        size = self.shingle_size
+        if len(text) <= size:
+            return {text}
+        return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+    def signature(self, text):
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self.shingles(text)]
+        if self.use_numpy:
+            values = (self._a * np.array(hashes, dtype=np.uint64) + self._b) % MERSENNE_PRIME
+            return tuple(values.min(axis=1).tolist())
+        prime = MERSENNE_PRIME
+        return tuple(min((a * value + b) % prime for value in hashes) for a, b in self.permutations)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def band_keys(signature, bands=BANDS):
+    """(band number, bucket) pairs of a signature; a bucket is a signed 64-bit hash of the band."""
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = struct.pack(f"<{rows}I", *signature[band * rows:(band + 1) * rows])
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True)
+        keys.append((band, bucket))
+    return keys
+
+
+def pack_signature(signature):
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def unpack_signature(data):
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+
+class MinHashLSH:
+    """In-memory LSH index: key -> signature plus band buckets."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, hasher=None, bands=BANDS):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+
+    def signature(self, text):
+        return self.hasher.signature(text)
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for band_key in band_keys(signature, self.bands):
+            self.buckets[band_key].append(key)
+
+    def find_similar(self, signature):
+        """Most similar stored key with similarity >= threshold as (key, similarity), or None."""
+        best = None
+        checked = set()
+        for band_key in band_keys(signature, self.bands):
+            for key in self.buckets.get(band_key, ())[:MAX_BUCKET_CANDIDATES]:
+                if key in checked:
+                    continue
+                checked.add(key)
+                score = similarity(signature, self.signatures[key])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score)
+        return best
+
+
+class SQLiteLSHIndex:
+    """LSH index in the content database. Methods take a cursor, so they run in the caller's transaction."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, hasher=None, bands=BANDS):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+
+    def signature(self, text):
+        return self.hasher.signature(text)
+
+    def add(self, cursor, content_hash, signature):
+        cursor.execute(
+            "INSERT OR REPLACE INTO minhash_signatures (content_hash, signature) VALUES (?, ?)",
+            (content_hash, pack_signature(signature))
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO lsh_buckets (band, bucket, content_hash) VALUES (?, ?, ?)",
+            [(band, bucket, content_hash) for band, bucket in band_keys(signature, self.bands)]
+        )
+
+    def find_similar(self, cursor, signature):
+        """Most similar stored text with similarity >= threshold as (content_hash, similarity), or None.
+
+        Candidates are ranked by the number of bands they share with `signature`,
+        then by content_hash, so the same MAX_CANDIDATES are checked on every run.
+        """
+        keys = band_keys(signature, self.bands)
+        cursor.execute(
+            f"""
+            SELECT s.content_hash, s.signature
+            FROM (
+                SELECT content_hash, COUNT(*) AS shared_bands
+                FROM lsh_buckets
+                WHERE {" OR ".join(["(band = ? AND bucket = ?)"] * len(keys))}
+                GROUP BY content_hash
+                ORDER BY shared_bands DESC, content_hash
+                LIMIT ?
+            ) c JOIN minhash_signatures s ON s.content_hash = c.content_hash
+            ORDER BY c.shared_bands DESC, c.content_hash
+            """,
+            [value for key in keys for value in key] + [MAX_CANDIDATES]
+        )
+        best = None
+        for content_hash, data in cursor.fetchall():
+            score = similarity(signature, unpack_signature(data))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (content_hash, score)
+        return best
@@ -0,0 +1,229 @@
+"""
+Retention: moves expired ads and old news out of the live stores.
+
+The live stores only grow, and content_storage.json / .xml are rewritten as a
+whole on every save. apply_retention() keeps them at the size of the live
+working set:
+
+1. Ads that expired before `as_of` and news created more than `news_days`
+   days before it are appended to an archive (binary_store .bin format) and
+   deleted from the database, `batch_size` rows per transaction. Texts no
+   other record uses are deleted too (with their FTS entries and MinHash
+   signatures), and the records are subtracted from the cached analytics
+   counts in the same transaction (see db_analytics.subtract_records). A
+   batch is written to the archive before its rows are deleted, so an
+   interrupted run never loses records; at worst the last batch is archived
+   twice.
+2. The same records are dropped from content_storage.json and .xml (each file
+   is rewritten once and replaced atomically). content_storage.txt is
+   append-only and IncrementalStats reads it by offset, so it is kept as is.
+3. Free pages go back to the file system with PRAGMA incremental_vacuum. A
+   database created before auto_vacuum was enabled gets one full VACUUM
+   instead; VACUUM may renumber the rowids of content_blobs, so the FTS
+   index is rebuilt after it.
+
+Jokes never expire and news without created_at are kept.
+
+Usage: python retention.py [--as-of DD-MM-YYYY] [--news-days 90] [--archive content_archive.bin]
+"""
+
+from datetime import datetime, timedelta
+from xml.etree import ElementTree as ET
+import argparse
+import json
+import os
+import sqlite3
+
+from binary_store import BinaryRecordStore, Record
+from db_analytics import subtract_records
+from db_content_manager import DBManager
+from expiration_index import to_date
+
+NEWS_RETENTION_DAYS = 90
+ARCHIVE_BATCH_SIZE = 1000
+
+# PRAGMA auto_vacuum: 2 - INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Формати дат у content_storage.json / .xml (див. Content.to_json)
+STORE_DATE_FORMATS = {
+    "ad": ("expiration_date", "%d/%m/%Y"),
+    "news": ("timestamp", "%d/%m/%Y %H.%M"),
+}
+
+
+def archive_table(db_manager, archive, record_type, table, column, condition, value,
+                  batch_size=ARCHIVE_BATCH_SIZE, log=print):
+    """Moves the rows of one table that match `condition` to the archive. Returns the number of rows."""
+    archived = 0
+    last_id = 0
+    while True:
+        with db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT t.id, t.content_hash, b.content, t.{column}, t.created_at
+                FROM {table} t JOIN content_blobs b ON b.content_hash = t.content_hash
+                WHERE {condition} AND t.id > ?
+                ORDER BY t.id
+                LIMIT ?
+                """,
+                (value, last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return archived
+            # Спочатку архів, потім видалення: обірваний запуск нічого не втрачає
+            archive.extend(
+                Record(record_type, content, str(additional), created_at or "")
+                for _, _, content, additional, created_at in rows
+            )
+            subtract_records(cursor, record_type, [(row[0], row[4], row[2]) for row in rows])
+            cursor.executemany(f"DELETE FROM {table} WHERE id = ?", [(row[0],) for row in rows])
+            db_manager.delete_unused_blobs(cursor, [row[1] for row in rows])
+            conn.commit()
+        archived += len(rows)
+        last_id = rows[-1][0]
+        log(f"  {table}: archived {archived} rows")
+
+
+def archive_database(db_manager, archive, as_of=None, news_days=NEWS_RETENTION_DAYS,
+                     batch_size=ARCHIVE_BATCH_SIZE, log=print):
+    """Archives expired ads and old news. Returns {'ad': count, 'news': count}."""
+    as_of = to_date(as_of)
+    news_cutoff = as_of - timedelta(days=news_days)
+    return {
+        "ad": archive_table(db_manager, archive, "ad", "ads", "expiration_date",
+                            "t.expires_on < ?", as_of.isoformat(), batch_size, log),
+        "news": archive_table(db_manager, archive, "news", "news", "city",
+                              "t.created_at < ?", news_cutoff.isoformat(), batch_size, log),
+    }
+
+
+def is_live(record_type, value, as_of, news_cutoff):
+    """Whether a JSON/XML item stays in the live store; `value` is its date field as written there."""
+    if record_type not in STORE_DATE_FORMATS or not value:
+        return True
+    try:
+        day = datetime.strptime(value, STORE_DATE_FORMATS[record_type][1]).date()
+    except ValueError:
+        return True
+    return day >= (as_of if record_type == "ad" else news_cutoff)
+
+
+def compact_json(filename, as_of=None, news_days=NEWS_RETENTION_DAYS):
+    """Drops expired ads and old news from content_storage.json. Returns the number of dropped items."""
+    as_of = to_date(as_of)
+    news_cutoff = as_of - timedelta(days=news_days)
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0
+    live = [
+        item for item in data
+        if is_live(item.get("type"), item.get(STORE_DATE_FORMATS.get(item.get("type"), ("",))[0]),
+                   as_of, news_cutoff)
+    ]
+    if len(live) == len(data):
+        return 0
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w", encoding="utf-8") as file:
+        json.dump(live, file, indent=2, ensure_ascii=False)
+    os.replace(temp_filename, filename)
+    return len(data) - len(live)
+
+
+def compact_xml(filename, as_of=None, news_days=NEWS_RETENTION_DAYS):
+    """Drops expired ads and old news from content_storage.xml. Returns the number of dropped items."""
+    as_of = to_date(as_of)
+    news_cutoff = as_of - timedelta(days=news_days)
+    try:
+        tree = ET.parse(filename)
+    except (FileNotFoundError, ET.ParseError):
+        return 0
+    root = tree.getroot()
+    expired = [
+        element for element in root
+        if not is_live(element.tag, element.findtext(STORE_DATE_FORMATS.get(element.tag, ("",))[0]),
+                       as_of, news_cutoff)
+    ]
+    if not expired:
+        return 0
+    for element in expired:
+        root.remove(element)
+    temp_filename = filename + ".tmp"
+    tree.write(temp_filename, encoding="utf-8", xml_declaration=True)
+    os.replace(temp_filename, filename)
+    return len(expired)
+
+
+def vacuum(db_manager, pages=0, log=print):
+    """Returns free pages to the file system (0 - all of them). Returns True if a full VACUUM was needed.
+
+    Uses its own sqlite3 connection: executescript() runs incremental_vacuum to
+    the end, while execute() stops after its first step (one page).
+    """
+    with sqlite3.connect(db_manager.db_path) as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            return False
+
+        # Режим auto_vacuum змінюється лише повним VACUUM
+        log("Enabling incremental vacuum (one full VACUUM)")
+        conn.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+        if db_manager.fts_enabled:
+            # VACUUM може змінити rowid у content_blobs, на які посилається content_fts
+            conn.execute("INSERT INTO content_fts (content_fts) VALUES ('rebuild')")
+        return True
+
+
+def apply_retention(db_manager, as_of=None, news_days=NEWS_RETENTION_DAYS, archive_path=None,
+                    json_path=None, xml_path=None, batch_size=ARCHIVE_BATCH_SIZE, log=print):
+    """
+    Runs the whole retention pass.
+
+    Args:
+        db_manager (DBManager): Database to archive from.
+        as_of: Day the policy is applied on (date or DD-MM-YYYY / YYYY-MM-DD string), today by default.
+        news_days (int): News older than this many days are archived.
+        archive_path (str): Archive .bin file; new records are appended to it.
+        json_path, xml_path (str): Live stores to compact, None to skip.
+        batch_size (int): Rows per transaction.
+
+    Returns:
+        dict: Number of archived rows per type and of items dropped from the files.
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    archive_path = archive_path or os.path.join(current_dir, "content_archive.bin")
+
+    with BinaryRecordStore(archive_path) as archive:
+        summary = archive_database(db_manager, archive, as_of, news_days, batch_size, log)
+    if json_path:
+        summary["json"] = compact_json(json_path, as_of, news_days)
+    if xml_path:
+        summary["xml"] = compact_xml(xml_path, as_of, news_days)
+    vacuum(db_manager, log=log)
+    return summary
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Archive expired ads and old news, compact the live stores")
+    parser.add_argument("--db", default=os.path.join(current_dir, "content_storage.db"))
+    parser.add_argument("--as-of", help="day to apply the policy on (DD-MM-YYYY), today by default")
+    parser.add_argument("--news-days", type=int, default=NEWS_RETENTION_DAYS)
+    parser.add_argument("--archive", default=os.path.join(current_dir, "content_archive.bin"))
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--no-compact", action="store_true", help="leave content_storage.json and .xml as they are")
+    args = parser.parse_args()
+
+    stores = (None, None) if args.no_compact else (
+        os.path.join(current_dir, "content_storage.json"),
+        os.path.join(current_dir, "content_storage.xml"),
+    )
+    result = apply_retention(DBManager(args.db), args.as_of, args.news_days, args.archive,
+                             *stores, batch_size=args.batch_size)
+    print(f"Archived {result['ad']} ads and {result['news']} news to {args.archive}")
+    if not args.no_compact:
+        print(f"Dropped {result['json']} items from the JSON store and {result['xml']} from the XML store")
@@ -0,0 +1,74 @@
+"""
+Background, debounced regeneration of the statistics CSV files.
+
+Saves only call notify(). A daemon thread waits until no new save has arrived
+for `debounce` seconds (the end of a burst), or until `max_delay` seconds have
+passed since the first unprocessed save, and then runs the job once for the
+whole burst. The job itself never runs on the caller's thread.
+"""
+
+import threading
+import time
+
+
+class StatsWorker:
+    def __init__(self, job, debounce=2.0, max_delay=30.0):
+        self.job = job
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._first_event = None
+        self._last_event = None
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="stats-worker", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """Records a save event; returns immediately."""
+        with self._condition:
+            now = time.monotonic()
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._condition.notify()
+
+    def stop(self, flush=True):
+        """Stops the worker; with flush=True pending events are processed first."""
+        with self._condition:
+            self._stopping = True
+            if not flush:
+                self._first_event = None
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _wait_for_burst_end(self):
+        """Waits (holding the condition) until a pending burst is due. Returns False on stop without work."""
+        while True:
+            if self._first_event is None:
+                if self._stopping:
+                    return False
+                self._condition.wait()
+                continue
+            if self._stopping:
+                return True
+            now = time.monotonic()
+            due = min(self._last_event + self.debounce, self._first_event + self.max_delay)
+            if now >= due:
+                return True
+            self._condition.wait(due - now)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._wait_for_burst_end():
+                    return
+                self._first_event = None
+                self._last_event = None
+            try:
+                self.job()
+            except Exception as e:
+                print(f"Error updating statistics: {str(e)}")
@@ -0,0 +1,104 @@
+"""
+Batched text normalization engine.
+
+All patterns are compiled once, when a TextNormalizer is created, and every
+text goes through whitespace collapsing, word corrections ('iz' -> 'is') and
+capitalization in a single call. Use normalize_batch() for lists and
+normalize_stream() for iterables of any size.
+"""
+
+import re
+
+# Виправлення помилок, як у домашньому завданні 3 ('iz' -> 'is')
+HOMEWORK_CORRECTIONS = {"iz": "is"}
+
+_SENTENCE_BREAK = re.compile(r"([.!?]\s+)(\w)")
+
+
+def _upper_sentence_start(match):
+    return match.group(1) + match.group(2).upper()
+
+
+class TextNormalizer:
+    """
+    Normalizes texts with precompiled patterns.
+
+    Args:
+        corrections (dict): Whole-word replacements, matched case-insensitively.
+            A replacement keeps the capital letter of the word it replaces.
+        sentence_case (bool): Lowercase the text and capitalize every sentence
+            (the homework 3 style). By default only the first letter is
+            capitalized and the rest of the text is kept as typed.
+    """
+
+    def __init__(self, corrections=None, sentence_case=False):
+        self.corrections = {word.lower(): fix for word, fix in (corrections or {}).items()}
+        self.sentence_case = sentence_case
+        self._corrections_re = None
+        self._single_word = None
+        if self.corrections:
+            # Довші слова першими, щоб альтернатива не зупинялась на префіксі
+            words = sorted(self.corrections, key=len, reverse=True)
+            self._corrections_re = re.compile(
+                r"\b(?:" + "|".join(map(re.escape, words)) + r")\b",
+                0 if sentence_case else re.IGNORECASE
+            )
+            if sentence_case and len(words) == 1:
+                # Текст уже в нижньому регістрі: заміна без callback і перевірка підрядком
+                self._single_word = words[0]
+                self._single_fix = self.corrections[words[0]].replace("\\", "\\\\")
+
+    def _replace(self, match):
+        word = match.group(0)
+        fix = self.corrections[word.lower()]
+        return fix[:1].upper() + fix[1:] if word[:1].isupper() else fix
+
+    def normalize(self, text):
+        text = " ".join(text.split())
+        if self.sentence_case:
+            text = text.lower()
+            if self._single_word is not None:
+                if self._single_word in text:
+                    text = self._corrections_re.sub(self._single_fix, text)
+            elif self._corrections_re is not None:
+                text = self._corrections_re.sub(self._replace, text)
+            if "." in text or "!" in text or "?" in text:
+                text = _SENTENCE_BREAK.sub(_upper_sentence_start, text)
+        elif self._corrections_re is not None:
+            text = self._corrections_re.sub(self._replace, text)
+        return text[0].upper() + text[1:] if text else text
+
+    def normalize_batch(self, texts):
+        """Normalizes a list of texts and returns a new list."""
+        if self._corrections_re is None and not self.sentence_case:
+            # Найчастіший випадок - без виправлень, тому без зайвих викликів методів
+            result = []
+            append = result.append
+            for text in texts:
+                text = " ".join(text.split())
+                append(text[0].upper() + text[1:] if text else text)
+            return result
+        return list(map(self.normalize, texts))
+
+    def normalize_stream(self, texts, batch_size=10000):
+        """Lazily normalizes an iterable of texts, processing them in batches."""
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                yield from self.normalize_batch(batch)
+                batch = []
+        if batch:
+            yield from self.normalize_batch(batch)
+
+
+# Поведінка normalize_text у ContentManager: пробіли + перша велика літера
+DEFAULT_NORMALIZER = TextNormalizer()
+
+
+def normalize_text(text):
+    return DEFAULT_NORMALIZER.normalize(text)
+
+
+def normalize_texts(texts):
+    return DEFAULT_NORMALIZER.normalize_batch(texts)
@@ -5,6 +5,9 @@ import random  # Бібліотека для генерації випадков
 import json  # Бібліотека для роботи з JSON форматом
 from pathlib import Path  # Бібліотека для роботи з шляхами файлів
 import os  # Бібліотека для роботи з операційною системою
+from functools import partial  # Функція з наперед заданими аргументами
+from parallel_generation import iter_records  # Паралельна генерація записів
+from value_pools import FakerValues, ValuePools  # Джерела значень: Faker або попередньо згенеровані пули
 import xml.etree.ElementTree as ET  # Бібліотека для роботи з XML
 from datetime import datetime  # Бібліотека для роботи з датами та часом
 from xml.dom import minidom # Бібліотека для зручного форматування та запису у читабельному вигляді в xml-файл
@@ -12,8 +15,8 @@ from xml.dom import minidom # Бібліотека для зручного фо
 
 # Створюємо екземпляр Faker з українською локалізацією
 fake = Faker('uk_UA')
-# Додаємо англійську локалізацію для деяких даних
-fake_en = Faker('en_US')
+# Джерело міст, компаній, дат і текстів (див. use_value_pools)
+values = FakerValues(fake)
 
 # Список жартів для генерації контенту
 JOKES = [
@@ -43,6 +46,25 @@ AD_TEMPLATES = [
     "Революційна новинка: {product} від {brand}. Змініть своє життя на краще!"
 ]
 
+# Товари та сезони для шаблонів реклами
+PRODUCTS = ['смартфони', 'ноутбуки', 'планшети', 'телевізори',
+            'навушники', 'книги', 'меблі', 'одяг', 'взуття',
+            'косметика', 'побутова техніка']
+
+SEASONS = ['весна', 'літо', 'осінь', 'зима']
+
+def use_value_pools(enabled=True, base_date=None, **options):
+    """
+    Перемикає generate_record між викликами Faker та попередньо згенерованими пулами значень
+
+    Args:
+        enabled (bool): True - пули (value_pools.ValuePools), False - Faker для кожного значення
+        base_date (date): Перша дата діапазону дат, за замовчуванням сьогодні
+        **options: Параметри ValuePools (size, sentences, days, seed)
+    """
+    global values
+    values = ValuePools('uk_UA', base_date=base_date, **options) if enabled else FakerValues(fake, base_date=base_date)
+
 def generate_ad():
     """
     Генерує рекламне оголошення на основі шаблонів
@@ -50,17 +72,26 @@ def generate_ad():
     Returns:
         str: Згенерований рекламний текст з підставленими значеннями
     """
-    template = random.choice(AD_TEMPLATES)  # Вибираємо випадковий шаблон реклами
+    template = values.choice(AD_TEMPLATES)  # Вибираємо випадковий шаблон реклами
     return template.format(  # Заповнюємо шаблон даними
-        product=random.choice(['смартфони', 'ноутбуки', 'планшети', 'телевізори', 
-                             'навушники', 'книги', 'меблі', 'одяг', 'взуття', 
-                             'косметика', 'побутова техніка']),
+        product=values.choice(PRODUCTS),  # Вибираємо випадковий товар
         discount=random.randint(10, 90),  # Генеруємо випадкову знижку
-        date=fake.date_between(start_date='today', end_date='+30d').strftime('%d.%m.%Y'),  # Генеруємо дату
-        brand=fake.company(),  # Генеруємо назву компанії
-        season=random.choice(['весна', 'літо', 'осінь', 'зима'])  # Вибираємо випадковий сезон
+        date=values.date().strftime('%d.%m.%Y'),  # Генеруємо дату
+        brand=values.company(),  # Генеруємо назву компанії
+        season=values.choice(SEASONS)  # Вибираємо випадковий сезон
     )
 
+def seed_generator(seed):
+    """
+    Задає seed для random та Faker, parallel_generation викликає її для кожного чанку
+
+    Args:
+        seed: Значення seed
+    """
+    random.seed(seed)
+    fake.seed_instance(seed)
+    values.reset()
+
 def generate_record():
     """
     Генерує один запис (новину, рекламу або жарт)
@@ -71,13 +102,13 @@ def generate_record():
     record_type = random.choice(["news", "ad", "joke"])  # Вибираємо випадковий тип запису
     
     if record_type == "news":  # Якщо тип - новина
-        content = fake.text(max_nb_chars=200)  # Генеруємо текст новини
-        additional = fake.city()  # Генеруємо місто
+        content = values.text(max_nb_chars=200)  # Генеруємо текст новини
+        additional = values.city()  # Генеруємо місто
     elif record_type == "ad":  # Якщо тип - реклама
         content = generate_ad()  # Генеруємо рекламний текст
-        additional = fake.date_between(start_date='today', end_date='+30d').strftime('%d-%m-%Y')  # Генеруємо дату
+        additional = values.date().strftime('%d-%m-%Y')  # Генеруємо дату
     else:  # Якщо тип - жарт
-        content = random.choice(JOKES)  # Вибираємо випадковий жарт
+        content = values.choice(JOKES)  # Вибираємо випадковий жарт
         additional = str(random.randint(1, 10))  # Генеруємо рейтинг
     
     return {
@@ -140,13 +171,17 @@ def create_xml_content(records):
     
     return root
 
-def create_files(base_filename, num_records=10):
+def create_files(base_filename, num_records=10, workers=1, seed=None, unique=False, value_pools=False):
     """
     Створює файли з згенерованим контентом у форматах TXT, JSON та XML
     
     Args:
         base_filename (str): Базова назва файлу без розширення
         num_records (int): Кількість записів для генерації
+        workers (int): Кількість процесів (None - всі CPU), див. parallel_generation.py
+        seed: Seed для відтворюваної генерації
+        unique (bool): Пропускати записи з контентом, що вже був згенерований
+        value_pools (bool): Брати значення з попередньо згенерованих пулів (див. use_value_pools)
         
     Returns:
         bool: True якщо файли успішно створено, False у випадку помилки
@@ -158,14 +193,16 @@ def create_files(base_filename, num_records=10):
             Path(directory).mkdir(parents=True, exist_ok=True)
         
         # Генеруємо записи
-        records = [generate_record() for _ in range(num_records)]
+        # Джерело значень задається в цьому процесі та в кожному робочому процесі
+        records = list(iter_records(generate_record, seed_generator, num_records, workers, seed, unique,
+                                    setup=partial(use_value_pools, value_pools)))
         
         # Створюємо txt файл
         txt_filename = base_filename + ".txt"
         with open(txt_filename, 'w', encoding='utf-8') as file:
             for i, record in enumerate(records):
                 file.write(f"{record['type']}\n{record['content']}\n{record['additional']}")
-                if i < num_records - 1:
+                if i < len(records) - 1:
                     file.write("\n---\n")
         
         # Створюємо json файл